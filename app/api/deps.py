@@ -0,0 +1,91 @@
+import hmac
+from typing import Dict, Iterable
+
+from fastapi import Depends, Header, HTTPException, status
+from jose import JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.core.security import decode_token
+from app.core.token_cache import token_generations
+from app.infrastructure.db.revocation import revoked_jtis
+from app.repositories import EmployeeRepository
+
+
+def unauthorized(detail: str = "Не авторизован") -> HTTPException:
+    return HTTPException(status.HTTP_401_UNAUTHORIZED, detail=detail)
+
+
+def require_admin(x_admin_key: str | None = Header(None)) -> None:
+    """Доступ к служебным эндпоинтам по X-Admin-Key."""
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status.HTTP_404_NOT_FOUND)
+    if not x_admin_key or not hmac.compare_digest(
+        x_admin_key, settings.ADMIN_API_KEY
+    ):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, detail="Нет доступа")
+
+
+# ── токен из Authorization ─────────────────────────────────────
+# Зависимости без БД: объявляются в эндпоинте раньше get_db, поэтому
+# мусорный запрос отклоняется до того, как сессия что-то возьмёт из пула.
+def bearer_token(authorization: str | None = Header(None)) -> str:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        raise unauthorized("Отсутствует заголовок Authorization")
+    parts = authorization.split()
+    if len(parts) != 2:
+        raise unauthorized("Неверный заголовок Authorization")
+    return parts[1]
+
+
+def token_payload(token: str = Depends(bearer_token)) -> dict:
+    """Проверенный payload любого нашего токена."""
+    try:
+        payload = decode_token(token)
+    except JWTError:
+        raise unauthorized("Неверный токен")
+    if payload.get("type") not in ("access", "refresh") or (
+        "sub" not in payload or "jti" not in payload
+    ):
+        raise unauthorized("Неверный токен")
+    return payload
+
+
+def refresh_payload(payload: dict = Depends(token_payload)) -> dict:
+    """Payload refresh-токена, не отозванного по локальному фильтру."""
+    if payload["type"] != "refresh":
+        raise unauthorized("Ожидался refresh-токен")
+    if payload["jti"] in revoked_jtis:  # заведомо отозван — без БД
+        raise unauthorized("Refresh-токен отозван или истёк")
+    return payload
+
+
+# ── эпоха сессий (claim gen) ───────────────────────────────────
+async def current_generations(
+    db: AsyncSession, usernames: Iterable[str]
+) -> Dict[str, int]:
+    """
+    Текущие token_generation: из кеша, недостающие — одним запросом
+    (после него транзакция закрывается, соединение уходит в пул).
+    Удалённых сотрудников в ответе нет.
+    """
+    found: Dict[str, int] = {}
+    missing = set()
+    for username in usernames:
+        generation = token_generations.get(username)
+        if generation is None:
+            missing.add(username)
+        else:
+            found[username] = generation
+    if missing:
+        fetched = await EmployeeRepository(db).token_generations(missing)
+        await db.commit()
+        for username, generation in fetched.items():
+            token_generations.set(username, generation)
+        found.update(fetched)
+    return found
+
+
+def generation_is_current(payload: dict, generations: Dict[str, int]) -> bool:
+    """Токен выпущен в текущей эпохе сотрудника (не до «выхода везде»)."""
+    return generations.get(payload["sub"]) == payload.get("gen", 0)
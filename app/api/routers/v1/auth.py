@@ -1,28 +1,39 @@
+import math
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from jose import JWTError
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.deps import (
+    current_generations, generation_is_current, refresh_payload,
+    require_admin, token_payload, unauthorized,
+)
+from app.config.settings import settings
 from app.infrastructure.db.session import get_db
-from app.repositories import EmployeeRepository
-from app.models import RefreshTokenModel
+from app.infrastructure.db.revocation import revoked_jtis
+from app.infrastructure.rate_limit import client_ip, login_throttle
+from app.repositories import EmployeeRepository, RefreshTokenRepository
+from app.core.hashing import password_hasher
+from app.core.password_policy import needs_rehash
 from app.core.security import (
-    verify_password,
+    ENABLED_CLAIMS,
     create_access_token,
     create_refresh_token,
-    decode_token,
+    token_claims,
+)
+from app.core.token_cache import decoded_tokens, token_generations
+from app.schemas import (
+    IntrospectIn, IntrospectOut, TokenIntrospection, TokenPair,
 )
-from app.core.time_utils import utc_now
-from app.schemas import TokenPair
+from app.services.last_login import last_login_recorder
+from app.services.password_rehash import password_rehasher
+from app.services.refresh_token_batcher import refresh_token_batcher
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-def _unauth(detail: str = "Не авторизован") -> HTTPException:
-    return HTTPException(status.HTTP_401_UNAUTHORIZED, detail=detail)
-
-
 # ---------- /login ----------
 class LoginIn(BaseModel):
     username: str
@@ -30,88 +41,179 @@ class LoginIn(BaseModel):
 
 
 @router.post("/login", response_model=TokenPair)
-async def login(data: LoginIn, db: AsyncSession = Depends(get_db)):
+async def login(
+    data: LoginIn,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+):
+    if settings.LOGIN_THROTTLE_ENABLED:  # до БД и PBKDF2
+        wait = await login_throttle.check(
+            client_ip(request.headers, request.client), data.username)
+        if wait:
+            raise HTTPException(
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Слишком много попыток входа",
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+
     repo = EmployeeRepository(db)
-    user = await repo.get_by_username(data.username)
-    if not user or not verify_password(data.password, user.password):
-        raise _unauth("Неверные имя пользователя или пароль")
+    user = await repo.get_credentials(
+        data.username, with_company_ids="cid" in ENABLED_CLAIMS
+    )
+    await db.commit()  # отпускаем соединение в пул на время PBKDF2
+    if not user or not await password_hasher.verify(
+        data.password, user.password
+    ):
+        raise unauthorized("Неверные имя пользователя или пароль")
     if not user.is_active:
-        raise _unauth("Пользователь деактивирован")
-
-    access = create_access_token(user.username)
-    refresh, jti, exp_ts = create_refresh_token(user.username)
-
-    db.add(
-        RefreshTokenModel(
-            jti=jti,
+        raise unauthorized("Пользователь деактивирован")
+    if settings.PASSWORD_REHASH_ON_LOGIN and needs_rehash(user.password):
+        # фоном, после ответа: хеш по новой политике + условный UPDATE
+        password_rehasher.schedule(user.id, data.password, user.password)
+
+    access = create_access_token(
+        user.username,
+        user.token_generation,
+        token_claims(
             employee_id=user.id,
-            expires_at=datetime.fromtimestamp(exp_ts, tz=timezone.utc),
-        )
+            status=user.status,
+            company_ids=user.company_ids,
+        ),
+    )
+    refresh, jti, exp_ts = create_refresh_token(
+        user.username, user.token_generation
+    )
+
+    row = dict(
+        jti=jti,
+        employee_id=user.id,
+        expires_at=datetime.fromtimestamp(exp_ts, tz=timezone.utc),
     )
-    await db.commit()
+    if settings.REFRESH_INSERT_BATCHING:
+        await refresh_token_batcher.insert(**row)  # ждём group commit
+    else:
+        await RefreshTokenRepository(db).create(**row)
+    if settings.LAST_LOGIN_TRACKING:
+        last_login_recorder.record(user.id)
     return TokenPair(access_token=access, refresh_token=refresh)
 
 
 # ---------- /refresh ----------
 @router.post("/refresh", response_model=TokenPair)
 async def refresh(
-    authorization: str | None = Header(None),
+    payload: dict = Depends(refresh_payload),
     db: AsyncSession = Depends(get_db),
 ):
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise _unauth("Отсутствует заголовок Authorization")
-    raw_token = authorization.split()[1]
-
-    payload = decode_token(raw_token)
-    if payload.get("type") != "refresh":
-        raise _unauth("Ожидался refresh-токен")
+    generation = payload.get("gen", 0)
+    new_refresh, jti, exp_ts = create_refresh_token(
+        payload["sub"], generation
+    )
 
-    token_row: RefreshTokenModel | None = await db.get(
-        RefreshTokenModel, {"jti": payload["jti"]}
+    # отзыв старого, вставка нового и данные для claims — один запрос
+    owner = await RefreshTokenRepository(db).rotate(
+        old_jti=payload["jti"],
+        generation=generation,
+        new_jti=jti,
+        new_expires_at=datetime.fromtimestamp(exp_ts, tz=timezone.utc),
+        with_company_ids="cid" in ENABLED_CLAIMS,
     )
-    if not token_row or token_row.revoked or token_row.expires_at < utc_now():
-        raise _unauth("Refresh-токен отозван или истёк")
-
-    token_row.revoked = True  # отзываем старый
-
-    access = create_access_token(payload["sub"])
-    new_refresh, jti, exp_ts = create_refresh_token(payload["sub"])
-    db.add(
-        RefreshTokenModel(
-            jti=jti,
-            employee_id=token_row.employee_id,
-            expires_at=datetime.fromtimestamp(exp_ts, tz=timezone.utc),
-        )
+    if owner is None:
+        raise unauthorized("Refresh-токен отозван или истёк")
+    access = create_access_token(
+        payload["sub"],
+        generation,
+        token_claims(
+            employee_id=owner.id,
+            status=owner.status,
+            company_ids=owner.company_ids,
+        ),
     )
-    await db.commit()
     return TokenPair(access_token=access, refresh_token=new_refresh)
 
 
 # ---------- /logout ----------
 @router.post("/logout", status_code=204)
 async def logout(
-    authorization: str | None = Header(None),
+    payload: dict = Depends(token_payload),
     db: AsyncSession = Depends(get_db),
 ):
-    if not authorization or not authorization.lower().startswith("bearer "):
-        raise _unauth("Отсутствует заголовок Authorization")
-    raw_token = authorization.split()[1]
-
+    if payload["type"] == "refresh":  # пришли с refresh-токеном
+        await RefreshTokenRepository(db).revoke(payload["jti"])
+    else:  # «выйти везде»: одна строка вместо всех токенов пользователя
+        username = payload["sub"]
+        generations = await current_generations(db, [username])
+        if not generation_is_current(payload, generations):
+            raise unauthorized("Токен отозван")
+        await EmployeeRepository(db).revoke_all_sessions(username)
+        token_generations.forget(username)
+
+
+# ---------- /introspect ----------
+def _decode_active(token: str) -> dict | None:
+    """Payload, если подпись и exp в порядке и jti не в фильтре отзыва."""
     try:
-        payload = decode_token(raw_token)
-    except Exception:
-        raise _unauth("Неверный токен")
+        payload = decoded_tokens.decode(token)
+    except JWTError:
+        return None
+    if payload.get("type") == "refresh" and payload["jti"] in revoked_jtis:
+        return None
+    return payload
+
+
+def _introspection(
+    payload: dict | None, generations: dict, active_jtis: set
+) -> TokenIntrospection:
+    if payload is None or not generation_is_current(payload, generations):
+        return TokenIntrospection(active=False)
+    if payload["type"] == "refresh" and payload["jti"] not in active_jtis:
+        return TokenIntrospection(active=False)
+    return TokenIntrospection(
+        active=True,
+        sub=payload.get("sub"),
+        username=payload.get("sub"),
+        token_type=payload.get("type"),
+        jti=payload.get("jti"),
+        exp=payload.get("exp"),
+        uid=payload.get("uid"),
+        st=payload.get("st"),
+        cid=payload.get("cid"),
+    )
 
-    if payload["type"] == "refresh":  # пришли с refresh-токеном
-        await db.execute(
-            RefreshTokenModel.__table__.update()
-            .where(RefreshTokenModel.jti == payload["jti"])
-            .values(revoked=True)
-        )
-    else:  # отзываем все refresh-токены пользователя
-        await db.execute(
-            RefreshTokenModel.__table__.update()
-            .where(RefreshTokenModel.employee_id == payload["sub"])
-            .values(revoked=True)
+
+@router.post(
+    "/introspect",
+    response_model=IntrospectOut,
+    response_model_exclude_none=True,
+    dependencies=[Depends(require_admin)],
+)
+async def introspect(
+    data: IntrospectIn,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Пакетная проверка токенов для шлюзов (RFC 7662): подпись, exp,
+    эпоха сессий (claim gen против token_generation) и, для
+    refresh-токенов, строка в refresh_tokens. Эпохи — из кеша, промахи —
+    одним запросом на всю пачку; «выход везде» из другого воркера виден
+    не позже TOKEN_GENERATION_CACHE_TTL. Локальный фильтр отзыва только
+    отсекает заведомо отозванные jti, решение по остальным — за БД.
+    """
+    if len(data.tokens) > settings.INTROSPECT_MAX_BATCH:
+        raise HTTPException(
+            status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Не больше {settings.INTROSPECT_MAX_BATCH} токенов",
         )
-    await db.commit()
+    payloads = [_decode_active(t) for t in data.tokens]
+    generations = await current_generations(
+        db, {p["sub"] for p in payloads if p is not None})
+    refresh_jtis = {
+        p["jti"] for p in payloads
+        if p is not None and p["type"] == "refresh"
+    }
+    active_jtis = set()
+    if refresh_jtis:
+        active_jtis = await RefreshTokenRepository(db).active_jtis(
+            refresh_jtis)
+    return IntrospectOut(results=[
+        _introspection(p, generations, active_jtis) for p in payloads
+    ])
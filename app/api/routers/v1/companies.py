@@ -0,0 +1,52 @@
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require_admin
+from app.infrastructure.db.routing import (
+    get_routed_db, routed_session_maker,
+)
+from app.schemas import CompanyOut, CompanyPage
+from app.services.company import CompanyService
+
+router = APIRouter(
+    prefix="/companies",
+    tags=["companies"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+# ---------- / ----------
+@router.get("", response_model=CompanyPage)
+async def list_companies(
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    is_active: bool | None = None,
+    db: AsyncSession = Depends(get_routed_db),
+):
+    items = await CompanyService(db).list_page(
+        after_id=after_id, limit=limit, is_active=is_active,
+    )
+    next_after = items[-1].id if len(items) == limit else None
+    return CompanyPage(items=items, next_after=next_after)
+
+
+# ---------- /export ----------
+@router.get("/export")
+async def export_companies(is_active: bool | None = None):
+    """Все компании в NDJSON; память не растёт с числом строк."""
+
+    async def lines() -> AsyncIterator[str]:
+        # своя сессия: соединение нужно, пока тело ответа отдаётся
+        async with routed_session_maker() as session:
+            async for part in CompanyService(session).stream_all(
+                is_active=is_active,
+            ):
+                yield "".join(
+                    CompanyOut.model_validate(c).model_dump_json() + "\n"
+                    for c in part
+                )
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,62 @@
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import require_admin
+from app.infrastructure.db.routing import (
+    get_routed_db, routed_session_maker,
+)
+from app.schemas import EmployeeOut, EmployeePage
+from app.services.employee import EmployeeService
+
+router = APIRouter(
+    prefix="/employees",
+    tags=["employees"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+# ---------- / ----------
+@router.get("", response_model=EmployeePage)
+async def list_employees(
+    after_id: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    is_active: bool | None = None,
+    company_id: int | None = None,
+    status: str | None = None,
+    db: AsyncSession = Depends(get_routed_db),
+):
+    items = await EmployeeService(db).list_page(
+        after_id=after_id,
+        limit=limit,
+        is_active=is_active,
+        company_id=company_id,
+        status=status,
+    )
+    next_after = items[-1].id if len(items) == limit else None
+    return EmployeePage(items=items, next_after=next_after)
+
+
+# ---------- /export ----------
+@router.get("/export")
+async def export_employees(
+    is_active: bool | None = None,
+    company_id: int | None = None,
+    status: str | None = None,
+):
+    """Весь справочник в NDJSON; память не растёт с числом строк."""
+
+    async def lines() -> AsyncIterator[str]:
+        # своя сессия: соединение нужно, пока тело ответа отдаётся
+        async with routed_session_maker() as session:
+            async for part in EmployeeService(session).stream_all(
+                is_active=is_active, company_id=company_id, status=status,
+            ):
+                yield "".join(
+                    EmployeeOut.model_validate(e).model_dump_json() + "\n"
+                    for e in part
+                )
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,53 @@
+from fastapi import APIRouter
+
+from app.config.settings import settings
+from app.core.token_cache import decoded_tokens
+from app.infrastructure.cache import cache
+from app.infrastructure.db.routing import replicas
+from app.infrastructure.db.session import pool_stats
+from app.infrastructure.rate_limit import login_throttle
+from app.services.token_reaper import token_reaper
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+# ---------- /pool ----------
+@router.get("/pool")
+async def pool() -> dict:
+    """Загрузка пула соединений с БД: checked_out / overflow / size."""
+    return {**pool_stats(), "replicas": replicas.stats()}
+
+
+# ---------- /refresh-tokens ----------
+@router.get("/refresh-tokens")
+async def refresh_tokens() -> dict:
+    """Размер таблицы refresh_tokens и пропускная способность очистки."""
+    return await token_reaper.stats()
+
+
+# ---------- /cache ----------
+@router.get("/cache")
+async def cache_stats() -> dict:
+    """Счётчики кеша чтений: hit / miss / eviction / invalidation."""
+    return {
+        "backend": settings.CACHE_BACKEND,
+        "size": cache.size(),
+        **cache.stats.as_dict(),
+    }
+
+
+# ---------- /introspect-cache ----------
+@router.get("/introspect-cache")
+async def introspect_cache_stats() -> dict:
+    """LRU расшифрованных токенов /introspect: размер и hit / miss."""
+    return decoded_tokens.stats()
+
+
+# ---------- /login-throttle ----------
+@router.get("/login-throttle")
+async def login_throttle_stats() -> dict:
+    """Сколько ключей (IP / имён) сейчас отслеживает лимитер входа."""
+    return {
+        "backend": settings.LOGIN_THROTTLE_BACKEND,
+        **login_throttle.stats(),
+    }
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.api.deps import require_admin
+from app.infrastructure.profiling import profile_store
+
+router = APIRouter(
+    prefix="/profiles",
+    tags=["profiles"],
+    dependencies=[Depends(require_admin)],
+)
+
+
+def _artifact(profile_id: str, suffix: str) -> FileResponse:
+    path = profile_store.path(profile_id, suffix)
+    if path is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND)
+    return FileResponse(path, filename=path.name)
+
+
+# ---------- / ----------
+@router.get("")
+async def list_profiles() -> list:
+    """Сохранённые профили, свежие первыми (без спанов и топа)."""
+    return profile_store.list()
+
+
+# ---------- /{id} ----------
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str) -> FileResponse:
+    """Сводка: SQL со временем, ожидание хеширования, топ функций."""
+    return _artifact(profile_id, ".json")
+
+
+@router.get("/{profile_id}/pstats")
+async def get_profile_pstats(profile_id: str) -> FileResponse:
+    """Сырой дамп cProfile — для snakeviz / python -m pstats."""
+    return _artifact(profile_id, ".prof")
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Header, Response
+
+from app.config.settings import settings
+from app.core.jwks import get_key_ring
+
+router = APIRouter(prefix="/.well-known", tags=["jwks"])
+
+_EMPTY_JWKS = b'{"keys":[]}'
+
+
+# ---------- /jwks.json ----------
+@router.get("/jwks.json")
+async def jwks(if_none_match: str | None = Header(None)) -> Response:
+    """Открытые ключи для локальной проверки access-токенов."""
+    ring = get_key_ring()
+    body = ring.jwks_json if ring else _EMPTY_JWKS
+    etag = ring.etag if ring else '"empty"'
+    headers = {
+        "Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE}",
+        "ETag": etag,
+    }
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=body, media_type="application/json", headers=headers
+    )
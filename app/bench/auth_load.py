@@ -0,0 +1,247 @@
+"""
+Нагрузочный прогон /auth/login, /auth/refresh и /auth/logout.
+
+    python -m app.bench.auth_load --out bench.json
+    python -m app.bench.auth_load --url http://127.0.0.1:8000 \\
+        --employees 5000 --tokens 20000 --concurrency 1,16,64
+
+Без --url приложение поднимается в процессе (ASGI-транспорт httpx), с
+--url — бьём в запущенный uvicorn; сервер должен смотреть в ту же БД и
+с тем же SECRET_KEY/JWT_*, что и этот процесс (сид идёт напрямую в БД).
+Сид идемпотентен: сотрудники bench-<n> с общим паролем, плюс пачка
+свежих refresh-токенов. Результат — JSON: rps и p50/p95/p99 по каждому
+эндпоинту и уровню конкурентности. Нужен пакет `httpx`. Все запросы
+идут с одного IP: в процессе лимитер входа выключается сам, запущенному
+серверу задайте LOGIN_THROTTLE_ENABLED=0.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+
+from app.config.settings import settings
+from app.core.security import create_refresh_token, get_password_hash
+from app.infrastructure.db.session import async_session_maker
+from app.models import EmployeeModel
+from app.repositories import EmployeeRepository, RefreshTokenRepository
+
+PREFIX = "bench-"
+PASSWORD = "bench-password"
+ENDPOINTS = ("login", "refresh", "logout")
+
+
+# ── сид ────────────────────────────────────────────────────────
+async def seed(employees: int, tokens: int,
+               chunk: int = 1000) -> Tuple[List[str], List[str]]:
+    """Вернуть (usernames, refresh-токены) для прогона."""
+    hashed = get_password_hash(PASSWORD)  # один хеш на всех — сид быстрый
+    usernames = [f"{PREFIX}{i}" for i in range(employees)]
+    async with async_session_maker() as session:
+        repo = EmployeeRepository(session)
+        for i in range(0, employees, chunk):
+            await repo.bulk_create([
+                {"username": u, "password": hashed, "last_name": "Bench",
+                 "name": "Bench", "patronymic": "Bench", "status": "bench"}
+                for u in usernames[i:i + chunk]
+            ], {})
+        res = await session.execute(
+            select(EmployeeModel.id, EmployeeModel.username,
+                   EmployeeModel.token_generation)
+            .where(EmployeeModel.username.like(f"{PREFIX}%"))
+        )
+        wanted = set(usernames)
+        owners = [row for row in res.all() if row.username in wanted]
+        await session.commit()
+
+        refresh_repo = RefreshTokenRepository(session)
+        issued: List[str] = []
+        while len(issued) < tokens:
+            rows = []
+            for _ in range(min(chunk, tokens - len(issued))):
+                emp_id, username, gen = random.choice(owners)
+                token, jti, exp_ts = create_refresh_token(username, gen)
+                issued.append(token)
+                rows.append({
+                    "jti": jti,
+                    "employee_id": emp_id,
+                    "expires_at": datetime.fromtimestamp(
+                        exp_ts, tz=timezone.utc),
+                })
+            await refresh_repo.insert_many(rows)
+    return usernames, issued
+
+
+# ── прогон ─────────────────────────────────────────────────────
+def _percentile(sorted_ms: List[float], q: float) -> float | None:
+    if not sorted_ms:
+        return None
+    idx = min(len(sorted_ms) - 1, int(round(q * (len(sorted_ms) - 1))))
+    return round(sorted_ms[idx], 3)
+
+
+async def run_level(
+    client,
+    endpoint: str,
+    concurrency: int,
+    requests: int,
+    usernames: List[str],
+    pool: List[str],
+) -> Dict:
+    """
+    `requests` запросов к одному эндпоинту силами `concurrency` задач.
+    refresh берёт токен из общего пула и кладёт новый обратно;
+    logout токен расходует; login пополняет пул.
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = requests
+
+    async def one() -> None:
+        if endpoint == "login":
+            return await client.post("/api/v1/auth/login", json={
+                "username": random.choice(usernames), "password": PASSWORD,
+            })
+        if not pool:
+            return None
+        token = pool.pop()
+        return await client.post(
+            f"/api/v1/auth/{endpoint}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                resp = await one()
+            except Exception as exc:  # сеть/таймаут — тоже результат
+                statuses[type(exc).__name__] += 1
+                continue
+            if resp is None:  # пул токенов исчерпан
+                statuses["no_token"] += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[str(resp.status_code)] += 1
+            if resp.status_code == 200 and endpoint != "logout":
+                pool.append(resp.json()["refresh_token"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ok = statuses.get("200", 0) + statuses.get("204", 0)
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": sum(statuses.values()),
+        "ok": ok,
+        "statuses": dict(statuses),
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(ok / elapsed, 1) if elapsed else None,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "max_ms": round(latencies[-1], 3) if latencies else None,
+    }
+
+
+def _meta(args: argparse.Namespace) -> Dict:
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.url or "asgi",
+        "python": platform.python_version(),
+        "employees": args.employees,
+        "tokens": args.tokens,
+        "requests_per_level": args.requests,
+        "settings": {
+            k: getattr(settings, k) for k in (
+                "JWT_ALGORITHM", "JWT_BACKEND", "TOKEN_CLAIMS",
+                "PASSWORD_HASH_EXECUTOR", "PASSWORD_HASH_WORKERS",
+                "DB_POOL_SIZE", "DB_MAX_OVERFLOW",
+                "REFRESH_INSERT_BATCHING", "REVOCATION_FILTER_ENABLED",
+                "LOGIN_THROTTLE_ENABLED",
+            )
+        },
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict:
+    try:
+        import httpx
+    except ImportError as exc:  # pragma: no cover - опциональная зависимость
+        raise SystemExit("Нужен пакет `httpx`") from exc
+
+    app = None
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        # все запросы с одного «IP» — иначе меряем лимитер, а не вход
+        settings.LOGIN_THROTTLE_ENABLED = False
+        from app.main import app
+        await app.router.startup()  # create_all — до сида на чистой БД
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://bench"
+
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    results = []
+    try:
+        usernames, pool = await seed(args.employees, args.tokens)
+        random.shuffle(pool)
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url,
+            limits=limits, timeout=args.timeout,
+        ) as client:
+            for endpoint in args.endpoints:
+                for level in args.concurrency:
+                    row = await run_level(
+                        client, endpoint, level, args.requests,
+                        usernames, pool,
+                    )
+                    results.append(row)
+                    print(json.dumps(row), file=sys.stderr)
+    finally:
+        if app is not None:
+            await app.router.shutdown()
+    return {"meta": _meta(args), "results": results}
+
+
+def _csv(kind):
+    return lambda s: [kind(x) for x in s.split(",") if x]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", help="запущенный сервер; иначе ASGI")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--tokens", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500,
+                        help="запросов на эндпоинт и уровень")
+    parser.add_argument("--concurrency", type=_csv(int), default=[1, 8, 32])
+    parser.add_argument("--endpoints", type=_csv(str),
+                        default=list(ENDPOINTS))
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out", help="JSON с результатами; иначе stdout")
+    args = parser.parse_args()
+    unknown = set(args.endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"неизвестные эндпоинты: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(main(args))
+    body = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(body + "\n")
+    else:
+        print(body)
@@ -8,13 +8,156 @@ class Settings(BaseSettings):
     # ─── база данных ────────────────────────────────
     DATABASE_URL: str = Field(..., env="DATABASE_URL")
     DB_ECHO: bool = Field(False, alias="DB_ECHO")
+    DB_POOL_SIZE: int = Field(10, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT: float = Field(30.0, env="DB_POOL_TIMEOUT")   # секунды
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")     # -1 → выкл.
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING")
+    # кеш подготовленных выражений asyncpg (на соединение)
+    DB_STATEMENT_CACHE_SIZE: int = Field(100, env="DB_STATEMENT_CACHE_SIZE")
+    # за PgBouncer в transaction-режиме: без кеша, уникальные имена
+    DB_PGBOUNCER: bool = Field(False, env="DB_PGBOUNCER")
+    # реплики для чтения через запятую; пусто — всё идёт в DATABASE_URL
+    DB_REPLICA_URLS: str = Field("", env="DB_REPLICA_URLS")
+    DB_REPLICA_CHECK_INTERVAL: float = Field(
+        5.0, env="DB_REPLICA_CHECK_INTERVAL")       # секунды
+    DB_REPLICA_MAX_LAG: float = Field(
+        5.0, env="DB_REPLICA_MAX_LAG")              # отставание, сек
+    # после записи клиент читает с primary столько секунд (0 → выкл.)
+    DB_STICKY_PRIMARY_SECONDS: float = Field(
+        2.0, env="DB_STICKY_PRIMARY_SECONDS")
 
     # ─── JWT ────────────────────────────────────────
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
-    JWT_ALGORITHM: str = "HS256"
+    JWT_ALGORITHM: str = Field("HS256", env="JWT_ALGORITHM")
+    # jose | fast (HS* на stdlib hmac) | pyjwt; RS*/ES* всегда через jose
+    JWT_BACKEND: str = Field("fast", env="JWT_BACKEND")
+    # для RS*/ES*: каталог с приватными ключами <kid>.pem; все ключи
+    # каталога принимаются при проверке, подписывает JWT_ACTIVE_KID
+    # (по умолчанию — последний kid по алфавиту)
+    JWT_KEYS_DIR: str | None = Field(None, env="JWT_KEYS_DIR")
+    JWT_ACTIVE_KID: str | None = Field(None, env="JWT_ACTIVE_KID")
+    JWKS_MAX_AGE: int = Field(300, env="JWKS_MAX_AGE")   # Cache-Control, сек
+    # доп. claims в access-токене через запятую: uid (id сотрудника),
+    # st (статус), cid (id активных компаний); пусто — только sub
+    TOKEN_CLAIMS: str = Field("", env="TOKEN_CLAIMS")
+    # если JSON доп. claims длиннее — cid не кладём (потребитель идёт в API)
+    TOKEN_CLAIMS_MAX_BYTES: int = Field(1024, env="TOKEN_CLAIMS_MAX_BYTES")
+    # /introspect: токенов в одном запросе и LRU расшифрованных токенов
+    INTROSPECT_MAX_BATCH: int = Field(100, env="INTROSPECT_MAX_BATCH")
+    INTROSPECT_CACHE_SIZE: int = Field(10_000, env="INTROSPECT_CACHE_SIZE")
+    # token_generation сотрудников для проверки claim gen у access-токенов:
+    # «выход везде» в другом воркере виден не позже чем через TTL; 0 — БД
+    TOKEN_GENERATION_CACHE_TTL: float = Field(
+        5.0, env="TOKEN_GENERATION_CACHE_TTL")
+    TOKEN_GENERATION_CACHE_SIZE: int = Field(
+        10_000, env="TOKEN_GENERATION_CACHE_SIZE")
     ACCESS_EXPIRE_MIN: int = Field(5, env="ACCESS_EXPIRE_MIN")
     REFRESH_EXPIRE_DAYS: int = Field(30, env="REFRESH_EXPIRE_DAYS")
 
+    # ─── фильтр отозванных refresh-токенов (LISTEN/NOTIFY) ─
+    REVOCATION_FILTER_ENABLED: bool = Field(
+        True, env="REVOCATION_FILTER_ENABLED")
+    REVOCATION_FILTER_SIZE: int = Field(
+        100_000, env="REVOCATION_FILTER_SIZE")      # jti на воркер
+    REVOCATION_CHANNEL: str = Field(
+        "refresh_token_revoked", env="REVOCATION_CHANNEL")
+
+    # ─── очистка refresh_tokens ─────────────────────
+    REFRESH_PURGE_ENABLED: bool = Field(True, env="REFRESH_PURGE_ENABLED")
+    REFRESH_PURGE_INTERVAL: int = Field(
+        300, env="REFRESH_PURGE_INTERVAL")          # секунды между проходами
+    REFRESH_PURGE_BATCH: int = Field(5000, env="REFRESH_PURGE_BATCH")
+    # RANGE-секции по expires_at (месяц на секцию); меняет схему таблицы
+    REFRESH_TOKENS_PARTITIONED: bool = Field(
+        False, env="REFRESH_TOKENS_PARTITIONED")
+
+    # ─── group commit вставок refresh-токенов (/login) ─
+    REFRESH_INSERT_BATCHING: bool = Field(
+        False, env="REFRESH_INSERT_BATCHING")
+    REFRESH_INSERT_BATCH_MAX: int = Field(
+        500, env="REFRESH_INSERT_BATCH_MAX")        # строк в одном INSERT
+    REFRESH_INSERT_BATCH_DELAY_MS: float = Field(
+        5.0, env="REFRESH_INSERT_BATCH_DELAY_MS")   # окно накопления
+
+    # ─── last_login (копим в памяти, пишем пачкой) ─
+    LAST_LOGIN_TRACKING: bool = Field(True, env="LAST_LOGIN_TRACKING")
+    LAST_LOGIN_FLUSH_INTERVAL: float = Field(
+        10.0, env="LAST_LOGIN_FLUSH_INTERVAL")      # секунды
+
+    # ─── ограничение попыток входа (до БД и PBKDF2) ─
+    LOGIN_THROTTLE_ENABLED: bool = Field(True, env="LOGIN_THROTTLE_ENABLED")
+    # memory (на воркер) | redis (общий, минутное окно без burst)
+    LOGIN_THROTTLE_BACKEND: str = Field(
+        "memory", env="LOGIN_THROTTLE_BACKEND")
+    LOGIN_THROTTLE_REDIS_URL: str | None = Field(
+        None, env="LOGIN_THROTTLE_REDIS_URL")      # None → CACHE_REDIS_URL
+    LOGIN_USERNAME_PER_MINUTE: float = Field(
+        10, env="LOGIN_USERNAME_PER_MINUTE")
+    LOGIN_USERNAME_BURST: int = Field(5, env="LOGIN_USERNAME_BURST")
+    LOGIN_IP_PER_MINUTE: float = Field(60, env="LOGIN_IP_PER_MINUTE")
+    LOGIN_IP_BURST: int = Field(30, env="LOGIN_IP_BURST")
+    LOGIN_THROTTLE_MAX_KEYS: int = Field(
+        100_000, env="LOGIN_THROTTLE_MAX_KEYS")     # на каждый лимит
+    LOGIN_THROTTLE_SHARDS: int = Field(16, env="LOGIN_THROTTLE_SHARDS")
+    # брать IP из X-Forwarded-For (только за своим прокси!)
+    LOGIN_TRUST_FORWARDED_FOR: bool = Field(
+        False, env="LOGIN_TRUST_FORWARDED_FOR")
+    # сколько своих прокси стоит перед приложением: клиентский IP —
+    # столько-то записей с конца X-Forwarded-For (левые подделываемы)
+    LOGIN_TRUSTED_PROXY_HOPS: int = Field(
+        1, env="LOGIN_TRUSTED_PROXY_HOPS")
+
+    # ─── хеширование паролей ────────────────────────
+    # политика: scrypt | pbkdf2; подобрать стоимость —
+    # python -m app.core.password_policy --target-ms 250
+    PASSWORD_HASH_ALGORITHM: str = Field(
+        "scrypt", env="PASSWORD_HASH_ALGORITHM")
+    PASSWORD_SCRYPT_N: int = Field(32768, env="PASSWORD_SCRYPT_N")
+    PASSWORD_SCRYPT_R: int = Field(8, env="PASSWORD_SCRYPT_R")
+    PASSWORD_SCRYPT_P: int = Field(1, env="PASSWORD_SCRYPT_P")
+    PASSWORD_PBKDF2_HASH: str = Field("sha256", env="PASSWORD_PBKDF2_HASH")
+    PASSWORD_PBKDF2_ITERATIONS: int = Field(
+        1_000_000, env="PASSWORD_PBKDF2_ITERATIONS")
+    # >0 — калибровать стоимость под это время хеша на старте воркера
+    PASSWORD_HASH_TARGET_MS: float = Field(0, env="PASSWORD_HASH_TARGET_MS")
+    # после успешного входа фоном перехешировать устаревший хеш
+    PASSWORD_REHASH_ON_LOGIN: bool = Field(
+        True, env="PASSWORD_REHASH_ON_LOGIN")
+    # "thread" — scrypt/pbkdf2 в OpenSSL отпускают GIL, хватит потоков;
+    # "process" — отдельные процессы, если хешер держит GIL
+    PASSWORD_HASH_EXECUTOR: str = Field("thread", env="PASSWORD_HASH_EXECUTOR")
+    PASSWORD_HASH_WORKERS: int | None = Field(
+        None, env="PASSWORD_HASH_WORKERS")          # None → os.cpu_count()
+    PASSWORD_HASH_QUEUE_SIZE: int = Field(64, env="PASSWORD_HASH_QUEUE_SIZE")
+    PASSWORD_HASH_RETRY_AFTER: int = Field(
+        1, env="PASSWORD_HASH_RETRY_AFTER")         # секунды для Retry-After
+
+    # ─── кеш чтений (сотрудник+компании, компания) ──
+    CACHE_BACKEND: str = Field("memory", env="CACHE_BACKEND")  # memory|redis|none
+    CACHE_TTL: float = Field(60.0, env="CACHE_TTL")            # секунды
+    CACHE_MAX_SIZE: int = Field(10_000, env="CACHE_MAX_SIZE")  # для memory
+    CACHE_REDIS_URL: str = Field(
+        "redis://localhost:6379/0", env="CACHE_REDIS_URL")
+
+    # ─── метрики (/metrics, формат Prometheus) ──────
+    METRICS_ENABLED: bool = Field(True, env="METRICS_ENABLED")
+    METRICS_LOOP_LAG_INTERVAL: float = Field(
+        0.5, env="METRICS_LOOP_LAG_INTERVAL")       # секунды между замерами
+
+    # ─── профилирование запросов (cProfile + SQL) ───
+    # выкл. — ноль накладных расходов; вкл. — по X-Profile: 1 с
+    # X-Admin-Key или случайная доля запросов
+    PROFILING_ENABLED: bool = Field(False, env="PROFILING_ENABLED")
+    PROFILING_SAMPLE_RATE: float = Field(0.0, env="PROFILING_SAMPLE_RATE")
+    PROFILING_DIR: str = Field("/tmp/auth-profiles", env="PROFILING_DIR")
+    PROFILING_MAX_ARTIFACTS: int = Field(
+        100, env="PROFILING_MAX_ARTIFACTS")
+
+    # ─── служебные (админские) эндпоинты ────────────
+    # заголовок X-Admin-Key; пока ключ не задан, эндпоинты отключены
+    ADMIN_API_KEY: str | None = Field(None, env="ADMIN_API_KEY")
+
     # ─── прочее ─────────────────────────────────────
     ENV: str = Field("dev", env="ENV")
     DEBUG: bool = Field(True, env="DEBUG")
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Callable, List, Sequence, TypeVar
+
+from app.config.settings import settings
+from app.core.password_policy import current_method
+from app.core.security import get_password_hash, verify_password
+from app.infrastructure.profiling import current_profile
+
+T = TypeVar("T")
+
+
+def _hash_batch(passwords: List[str], method: str) -> List[str]:
+    # на уровне модуля — чтобы ProcessPoolExecutor мог её сериализовать;
+    # method явно: политика процесса-воркера могла не калиброваться
+    return [get_password_hash(p, method) for p in passwords]
+
+
+class HashingOverloaded(Exception):
+    """Очередь на хеширование переполнена — запрос нужно отклонить (503)."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Очередь хеширования паролей переполнена")
+        self.retry_after = retry_after
+
+
+class PasswordHasherPool:
+    """
+    Пул воркеров для хешей паролей, чтобы они не блокировали event loop.
+
+    Одновременно принимается не больше `workers + queue_size` задач;
+    всё сверх этого сразу отклоняется через HashingOverloaded.
+    """
+
+    def __init__(
+        self,
+        *,
+        executor: str = "thread",
+        workers: int | None = None,
+        queue_size: int = 64,
+        retry_after: int = 1,
+    ) -> None:
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Неизвестный тип пула: {executor!r}")
+        self._kind = executor
+        self._workers = workers or os.cpu_count() or 1
+        self._limit = self._workers + queue_size
+        self._retry_after = retry_after
+        self._pending = 0
+        self._executor: Executor | None = None
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        if self._executor is not None:
+            return
+        if self._kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers,
+                thread_name_prefix="pwd-hash",
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    # ---------- STATS ----------
+    @property
+    def pending(self) -> int:
+        """Сколько задач сейчас выполняется или ждёт в очереди."""
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        return self._limit
+
+    # ---------- API ----------
+    async def hash(self, password: str) -> str:
+        return await self._submit(
+            get_password_hash, password, current_method())
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._submit(verify_password, plain, hashed)
+
+    async def hash_many(self, passwords: Sequence[str]) -> List[str]:
+        """
+        Пачка паролей (массовый импорт): режем на `workers` частей,
+        по одной задаче на часть — меньше накладных расходов на IPC.
+        """
+        if not passwords:
+            return []
+        step = -(-len(passwords) // self._workers)
+        parts = await asyncio.gather(*(
+            self._submit(
+                _hash_batch, list(passwords[i:i + step]), current_method())
+            for i in range(0, len(passwords), step)
+        ))
+        return [h for part in parts for h in part]
+
+    # ---------- HELPERS ----------
+    async def _submit(self, fn: Callable[..., T], *args) -> T:
+        # проверка и инкремент без await между ними — атомарны в event loop
+        if self._pending >= self._limit:
+            raise HashingOverloaded(self._retry_after)
+        self.start()
+        self._pending += 1
+        profile = current_profile.get()
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            if profile is not None:  # PBKDF2 в потоке — cProfile не видит
+                profile.span("hash", started, fn=fn.__name__)
+
+
+password_hasher = PasswordHasherPool(
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
@@ -0,0 +1,116 @@
+"""
+Набор ключей для асимметричной подписи JWT (RS*/ES*) и JWKS.
+
+Ключи лежат в settings.JWT_KEYS_DIR файлами `<kid>.pem` (приватные).
+Ротация: кладём новый ключ, переключаем JWT_ACTIVE_KID, старый удаляем
+после истечения последних подписанных им refresh-токенов.
+
+Сгенерировать ключ:  python -m app.core.jwks <kid> [RS256|ES256]
+"""
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict
+
+from jose import jwk
+from jose.backends.base import Key
+
+from app.config.settings import settings
+
+ASYMMETRIC_ALGORITHMS = {
+    "RS256", "RS384", "RS512", "ES256", "ES384", "ES512",
+}
+
+
+def is_asymmetric(algorithm: str) -> bool:
+    return algorithm in ASYMMETRIC_ALGORITHMS
+
+
+class KeyRing:
+    """Активный ключ подписи + все ключи, которые принимаем при проверке."""
+
+    def __init__(self, keys_dir: str, algorithm: str,
+                 active_kid: str | None = None) -> None:
+        self.algorithm = algorithm
+        self._private: Dict[str, str] = {}
+        self._public: Dict[str, Key] = {}
+
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            pem = path.read_text()
+            self._private[path.stem] = pem
+            self._public[path.stem] = jwk.construct(
+                pem, algorithm).public_key()
+        if not self._private:
+            raise RuntimeError(f"В {keys_dir} нет ключей *.pem")
+
+        self.active_kid = active_kid or max(self._private)
+        if self.active_kid not in self._private:
+            raise RuntimeError(f"Ключ {self.active_kid!r} не найден")
+
+        self.jwks = {"keys": [self._jwk_dict(kid) for kid in self._public]}
+        body = json.dumps(self.jwks, separators=(",", ":"), sort_keys=True)
+        self.jwks_json = body.encode()
+        self.etag = '"' + hashlib.sha256(self.jwks_json).hexdigest()[:32] + '"'
+
+    # ---------- SIGN / VERIFY ----------
+    @property
+    def signing_key(self) -> str:
+        return self._private[self.active_kid]
+
+    def verification_key(self, kid: str | None) -> Key | None:
+        return self._public.get(kid) if kid else None
+
+    # ---------- HELPERS ----------
+    def _jwk_dict(self, kid: str) -> dict:
+        data = {
+            k: v.decode() if isinstance(v, bytes) else v
+            for k, v in self._public[kid].to_dict().items()
+        }
+        data.update(kid=kid, use="sig", alg=self.algorithm)
+        return data
+
+
+_key_ring: KeyRing | None = None
+
+
+def get_key_ring() -> KeyRing | None:
+    """KeyRing для асимметричных алгоритмов; для HS* — None."""
+    global _key_ring
+    if _key_ring is None and is_asymmetric(settings.JWT_ALGORITHM):
+        if not settings.JWT_KEYS_DIR:
+            raise RuntimeError(
+                f"{settings.JWT_ALGORITHM} требует JWT_KEYS_DIR")
+        _key_ring = KeyRing(
+            settings.JWT_KEYS_DIR,
+            settings.JWT_ALGORITHM,
+            settings.JWT_ACTIVE_KID,
+        )
+    return _key_ring
+
+
+# ── генерация ключа ────────────────────────────────────────────
+def generate_private_key_pem(algorithm: str) -> bytes:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+    if algorithm.startswith("RS"):
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        curve = {"ES256": ec.SECP256R1, "ES384": ec.SECP384R1,
+                 "ES512": ec.SECP521R1}[algorithm]
+        key = ec.generate_private_key(curve())
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+if __name__ == "__main__":
+    kid = sys.argv[1]
+    alg = sys.argv[2] if len(sys.argv) > 2 else "RS256"
+    target = Path(settings.JWT_KEYS_DIR or ".") / f"{kid}.pem"
+    target.write_bytes(generate_private_key_pem(alg))
+    target.chmod(0o600)
+    print(f"Ключ записан в {target}")
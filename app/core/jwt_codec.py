@@ -0,0 +1,242 @@
+"""
+Кодеки JWT: подпись и проверка за единым интерфейсом.
+
+"jose"  — python-jose, как раньше; единственный бэкенд для RS*/ES*
+          (через KeyRing и kid);
+"fast"  — HS* на stdlib hmac: ключ HMAC и base64 заголовка посчитаны
+          один раз, на токен — только JSON payload и один HMAC;
+"pyjwt" — HS* через PyJWT (нужен пакет `pyjwt`).
+
+Выпущенные токены совместимы между бэкендами: заголовок тот же, что
+пишет jose ({"alg":…,"typ":"JWT"}, ключи по алфавиту). Ошибки проверки
+всегда jose.JWTError / ExpiredSignatureError — вызывающим всё равно.
+
+Микробенчмарк:  python -m app.core.jwt_codec [-n 20000]
+"""
+import argparse
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict
+
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from app.config.settings import settings
+from app.core.jwks import KeyRing, get_key_ring, is_asymmetric
+
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _check_times(payload: Dict[str, Any]) -> None:
+    # то же, что проверяет jose для наших токенов: exp и (если есть) nbf
+    now = time.time()
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise JWTError("Invalid exp claim")
+        if exp <= now:
+            raise ExpiredSignatureError("Signature has expired.")
+    nbf = payload.get("nbf")
+    if isinstance(nbf, (int, float)) and nbf > now:
+        raise JWTError("The token is not yet valid (nbf)")
+
+
+class JWTCodec(ABC):
+    """Базовый интерфейс: payload с exp-числом ↔ компактный JWT."""
+
+    name = "base"
+
+    @abstractmethod
+    def encode(self, payload: Dict[str, Any]) -> str:
+        ...
+
+    @abstractmethod
+    def decode(self, token: str) -> Dict[str, Any]:
+        ...
+
+
+class JoseCodec(JWTCodec):
+    name = "jose"
+
+    def __init__(self, *, algorithm: str, secret: str,
+                 key_ring: KeyRing | None = None) -> None:
+        self._algorithm = algorithm
+        self._secret = secret
+        self._ring = key_ring
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        if self._ring is not None:  # RS*/ES*: приватный ключ + kid
+            return jwt.encode(
+                payload,
+                self._ring.signing_key,
+                algorithm=self._ring.algorithm,
+                headers={"kid": self._ring.active_kid},
+            )
+        return jwt.encode(payload, self._secret, algorithm=self._algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        key = self._secret
+        if self._ring is not None:  # ищем открытый ключ по kid
+            kid = jwt.get_unverified_header(token).get("kid")
+            key = self._ring.verification_key(kid)
+            if key is None:
+                raise JWTError("Неизвестный kid")
+        return jwt.decode(token, key, algorithms=[self._algorithm])
+
+
+class HmacCodec(JWTCodec):
+    """HS* без jose: ключ HMAC и заголовок предвычислены."""
+
+    name = "fast"
+
+    def __init__(self, *, algorithm: str, secret: str) -> None:
+        if algorithm not in _HMAC_DIGESTS:
+            raise ValueError(f"HmacCodec не поддерживает {algorithm}")
+        self._algorithm = algorithm
+        self._mac = hmac.new(
+            secret.encode(), digestmod=_HMAC_DIGESTS[algorithm])
+        header = json.dumps(
+            {"alg": algorithm, "typ": "JWT"},
+            separators=(",", ":"), sort_keys=True,
+        )
+        self._header = _b64encode(header.encode())
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        signing_input = self._header + b"." + _b64encode(body)
+        sig = _b64encode(self._sign(signing_input))
+        return (signing_input + b"." + sig).decode()
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        raw = token.encode()
+        try:
+            signing_input, sig = raw.rsplit(b".", 1)
+            header, body = signing_input.split(b".")
+        except ValueError:
+            raise JWTError("Not enough segments")
+        try:
+            if header != self._header:  # чужой порядок ключей — разберём
+                alg = json.loads(_b64decode(header)).get("alg")
+                if alg != self._algorithm:
+                    raise JWTError("The specified alg value is not allowed")
+            if not hmac.compare_digest(
+                self._sign(signing_input), _b64decode(sig)
+            ):
+                raise JWTError("Signature verification failed.")
+            payload = json.loads(_b64decode(body))
+        except (binascii.Error, ValueError, AttributeError):
+            raise JWTError("Invalid token")
+        if not isinstance(payload, dict):
+            raise JWTError("Invalid payload")
+        _check_times(payload)
+        return payload
+
+
+class PyJWTCodec(JWTCodec):
+    name = "pyjwt"
+
+    def __init__(self, *, algorithm: str, secret: str) -> None:
+        try:
+            import jwt as pyjwt
+        except ImportError as exc:  # pragma: no cover - опциональная зависимость
+            raise RuntimeError(
+                "JWT_BACKEND=pyjwt требует пакет `pyjwt`") from exc
+        if not hasattr(pyjwt, "PyJWTError"):  # python-jose тоже «jwt»
+            raise RuntimeError("JWT_BACKEND=pyjwt требует пакет `pyjwt`")
+        self._jwt = pyjwt
+        self._algorithm = algorithm
+        self._secret = secret
+
+    def encode(self, payload: Dict[str, Any]) -> str:
+        return self._jwt.encode(
+            payload, self._secret, algorithm=self._algorithm)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        try:
+            return self._jwt.decode(
+                token, self._secret, algorithms=[self._algorithm])
+        except self._jwt.ExpiredSignatureError as exc:
+            raise ExpiredSignatureError(str(exc)) from exc
+        except self._jwt.PyJWTError as exc:
+            raise JWTError(str(exc)) from exc
+
+
+_BACKENDS = {"jose": JoseCodec, "fast": HmacCodec, "pyjwt": PyJWTCodec}
+
+
+def build_codec(backend: str, *, algorithm: str, secret: str) -> JWTCodec:
+    if backend not in _BACKENDS:
+        raise ValueError(f"Неизвестный JWT_BACKEND: {backend!r}")
+    if is_asymmetric(algorithm):  # ключи и kid — только через jose
+        return JoseCodec(
+            algorithm=algorithm, secret=secret, key_ring=get_key_ring())
+    return _BACKENDS[backend](algorithm=algorithm, secret=secret)
+
+
+_codec: JWTCodec | None = None
+
+
+def get_codec() -> JWTCodec:
+    global _codec
+    if _codec is None:
+        _codec = build_codec(
+            settings.JWT_BACKEND,
+            algorithm=settings.JWT_ALGORITHM,
+            secret=settings.SECRET_KEY,
+        )
+    return _codec
+
+
+# ── микробенчмарк ──────────────────────────────────────────────
+def _bench(codec: JWTCodec, n: int) -> Dict[str, float]:
+    payload = {
+        "uid": 42, "st": "staff", "cid": [1, 2, 3], "sub": "bench",
+        "type": "access", "jti": "00000000-0000-0000-0000-000000000000",
+        "gen": 0, "exp": int(time.time()) + 3600,
+    }
+    started = time.perf_counter()
+    for _ in range(n):
+        token = codec.encode(payload)
+    sign = n / (time.perf_counter() - started)
+    started = time.perf_counter()
+    for _ in range(n):
+        codec.decode(token)
+    verify = n / (time.perf_counter() - started)
+    return {"sign_per_sec": round(sign), "verify_per_sec": round(verify)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="JWT sign/verify, токенов/с")
+    parser.add_argument("-n", type=int, default=20_000)
+    parser.add_argument("--algorithm", default="HS256")
+    args = parser.parse_args()
+    for backend in _BACKENDS:
+        try:
+            codec = build_codec(
+                backend, algorithm=args.algorithm, secret="b" * 64)
+        except RuntimeError as exc:
+            print(f"{backend:6} пропущен: {exc}")
+            continue
+        print(f"{backend:6} {json.dumps(_bench(codec, args.n))}")
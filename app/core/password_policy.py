@@ -0,0 +1,132 @@
+"""
+Политика хеширования паролей: алгоритм и стоимость.
+
+Хеш Werkzeug хранит параметры в префиксе (`scrypt:32768:8:1$…`,
+`pbkdf2:sha256:1000000$…`), поэтому «устаревший» хеш распознаётся без
+отдельной колонки. Устаревшим считается хеш другого алгоритма или
+меньшей стоимости — не большей: воркеры, откалиброванные чуть по-разному,
+не будут перехешировать друг за другом.
+
+Калибровка — подобрать стоимость под целевое время одного хеша:
+
+    python -m app.core.password_policy --target-ms 250 [--algorithm scrypt]
+
+печатает строки для .env. Либо PASSWORD_HASH_TARGET_MS — тогда
+калибровка идёт на старте приложения (см. app.main).
+"""
+import argparse
+import time
+from typing import Tuple
+
+from werkzeug.security import generate_password_hash
+
+from app.config.settings import settings
+
+ALGORITHMS = ("scrypt", "pbkdf2")
+
+
+def build_method(algorithm: str, *, iterations: int, n: int, r: int,
+                 p: int) -> str:
+    """Строка method для werkzeug.generate_password_hash."""
+    if algorithm == "scrypt":
+        return f"scrypt:{n}:{r}:{p}"
+    if algorithm == "pbkdf2":
+        return f"pbkdf2:{settings.PASSWORD_PBKDF2_HASH}:{iterations}"
+    raise ValueError(f"Неизвестный алгоритм хеширования: {algorithm!r}")
+
+
+_method = build_method(
+    settings.PASSWORD_HASH_ALGORITHM,
+    iterations=settings.PASSWORD_PBKDF2_ITERATIONS,
+    n=settings.PASSWORD_SCRYPT_N,
+    r=settings.PASSWORD_SCRYPT_R,
+    p=settings.PASSWORD_SCRYPT_P,
+)
+
+
+def current_method() -> str:
+    return _method
+
+
+def set_method(method: str) -> None:
+    """Сменить политику процесса (после калибровки на старте)."""
+    global _method
+    _method = method
+
+
+# ── устаревшие хеши ────────────────────────────────────────────
+def _cost(method: str) -> Tuple[str, Tuple[int, ...]]:
+    """('scrypt', (n, r, p)) / ('pbkdf2:sha256', (iterations,))."""
+    parts = method.split(":")
+    if parts[0] == "scrypt":
+        return "scrypt", tuple(int(x) for x in parts[1:4])
+    if parts[0] == "pbkdf2" and len(parts) == 3:
+        return f"pbkdf2:{parts[1]}", (int(parts[2]),)
+    return method, ()
+
+
+def needs_rehash(hashed: str, method: str | None = None) -> bool:
+    """Хеш другого алгоритма или дешевле текущей политики."""
+    stored_method = hashed.split("$", 1)[0]
+    try:
+        stored_alg, stored_cost = _cost(stored_method)
+        alg, cost = _cost(method or _method)
+    except ValueError:  # непонятный префикс — перехешируем
+        return True
+    if stored_alg != alg:
+        return True
+    # scrypt: память и работа ~ n*r, p — параллельные проходы
+    if alg == "scrypt":
+        return stored_cost[0] * stored_cost[1] * stored_cost[2] < (
+            cost[0] * cost[1] * cost[2])
+    return stored_cost < cost
+
+
+# ── калибровка ─────────────────────────────────────────────────
+def _time_ms(method: str, rounds: int = 3) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        generate_password_hash("calibration-password", method)
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+
+def calibrate(algorithm: str, target_ms: float) -> str:
+    """
+    Подобрать стоимость так, чтобы один хеш занимал ≈target_ms на этой
+    машине. scrypt: n — степень двойки (r=8, p=1), не выше нужного;
+    pbkdf2: итерации линейно по замеру, округлены до 10 000.
+    """
+    if algorithm == "scrypt":
+        n = 1 << 12
+        while n < (1 << 20):
+            if _time_ms(f"scrypt:{n * 2}:8:1") > target_ms:
+                break
+            n *= 2
+        return build_method("scrypt", iterations=0, n=n, r=8, p=1)
+
+    probe = 100_000
+    per_iter = _time_ms(build_method(
+        "pbkdf2", iterations=probe, n=0, r=0, p=0)) / probe
+    iterations = max(100_000, round(target_ms / per_iter / 10_000) * 10_000)
+    return build_method("pbkdf2", iterations=iterations, n=0, r=0, p=0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Подбор стоимости хеша под целевое время")
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--algorithm", choices=ALGORITHMS,
+                        default=settings.PASSWORD_HASH_ALGORITHM)
+    args = parser.parse_args()
+    method = calibrate(args.algorithm, args.target_ms)
+    print(f"# {method}: {_time_ms(method):.0f} мс на хеш")
+    alg, cost = _cost(method)
+    print(f"PASSWORD_HASH_ALGORITHM={args.algorithm}")
+    if args.algorithm == "scrypt":
+        print(f"PASSWORD_SCRYPT_N={cost[0]}")
+        print(f"PASSWORD_SCRYPT_R={cost[1]}")
+        print(f"PASSWORD_SCRYPT_P={cost[2]}")
+    else:
+        print(f"PASSWORD_PBKDF2_ITERATIONS={cost[0]}")
@@ -1,74 +1,134 @@
 from datetime import timedelta
+import json
+import time
 import uuid
-from typing import Tuple, Dict
+from typing import Any, Dict, FrozenSet, Iterable, Tuple
 
-from jose import jwt, JWTError
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from app.config.settings import settings
+from app.core.jwt_codec import get_codec
+from app.core.password_policy import current_method
 from app.core.time_utils import utc_now
+from app.infrastructure.metrics import hash_latency, jwt_latency
 
 # ── пароли ─────────────────────────────────────────────────────
 
 
-def get_password_hash(password: str) -> str:
-    """Создать хеш пароля (pbkdf2:sha256, соль внутри строки)."""
-    return generate_password_hash(password)
+def get_password_hash(password: str, method: str | None = None) -> str:
+    """
+    Создать хеш пароля по текущей политике (см. password_policy);
+    алгоритм, стоимость и соль — внутри строки. `method` передаётся
+    явно, когда хеш считается в другом процессе.
+    """
+    started = time.perf_counter()
+    try:
+        return generate_password_hash(password, method or current_method())
+    finally:
+        hash_latency.observe(time.perf_counter() - started, "hash")
 
 
 def verify_password(plain: str, hashed: str) -> bool:
     """Проверить пароль против сохранённого хеша."""
-    return check_password_hash(hashed, plain)
+    started = time.perf_counter()
+    try:
+        return check_password_hash(hashed, plain)
+    finally:
+        hash_latency.observe(time.perf_counter() - started, "verify")
+
+
+# ── claims ─────────────────────────────────────────────────────
+ENABLED_CLAIMS: FrozenSet[str] = frozenset(
+    c.strip() for c in settings.TOKEN_CLAIMS.split(",") if c.strip()
+)
+
+
+def token_claims(
+    *,
+    employee_id: int,
+    status: str,
+    company_ids: Iterable[int] | None,
+) -> Dict[str, Any]:
+    """
+    Доп. claims access-токена по settings.TOKEN_CLAIMS: короткие ключи,
+    id компаний — отсортированный список int. Если набор не влезает в
+    TOKEN_CLAIMS_MAX_BYTES, `cid` опускается: его отсутствие значит
+    «узнай через API», а не «компаний нет».
+    """
+    claims: Dict[str, Any] = {}
+    if "uid" in ENABLED_CLAIMS:
+        claims["uid"] = employee_id
+    if "st" in ENABLED_CLAIMS:
+        claims["st"] = status
+    if "cid" in ENABLED_CLAIMS and company_ids is not None:
+        claims["cid"] = sorted(company_ids)
+        size = len(json.dumps(claims, separators=(",", ":")))
+        if size > settings.TOKEN_CLAIMS_MAX_BYTES:
+            del claims["cid"]
+    return claims
 
 
 # ── JWT ────────────────────────────────────────────────────────
 def _create_jwt_token(
-    *, subject: str, token_type: str, expires_delta: timedelta
+    *,
+    subject: str,
+    token_type: str,
+    expires_delta: timedelta,
+    generation: int,
+    extra: Dict[str, Any] | None = None,
 ) -> Tuple[str, str, int]:
     """
     Сгенерировать JWT и вернуть (token, jti, exp_timestamp).
     `token_type` — 'access' или 'refresh'.
+    `generation` — EmployeeModel.token_generation на момент выпуска.
+    `extra` — доп. claims (см. token_claims), не перекрывают служебные.
     """
-    expire = utc_now() + expires_delta
+    exp_ts = int((utc_now() + expires_delta).timestamp())
     jti = str(uuid.uuid4())
-    payload: Dict[str, str | int] = {
+    payload: Dict[str, Any] = {
+        **(extra or {}),
         "sub": subject,
         "type": token_type,
         "jti": jti,
-        "exp": expire,
+        "gen": generation,
+        "exp": exp_ts,
     }
-    token = jwt.encode(
-        payload,
-        settings.SECRET_KEY,
-        algorithm=settings.JWT_ALGORITHM,
-    )
-    return token, jti, int(expire.timestamp())
+    started = time.perf_counter()
+    token = get_codec().encode(payload)
+    jwt_latency.observe(time.perf_counter() - started, "sign")
+    return token, jti, exp_ts
 
 
-def create_access_token(username: str) -> str:
+def create_access_token(
+    username: str,
+    generation: int,
+    claims: Dict[str, Any] | None = None,
+) -> str:
     return _create_jwt_token(
         subject=username,
         token_type="access",
         expires_delta=timedelta(minutes=settings.ACCESS_EXPIRE_MIN),
+        generation=generation,
+        extra=claims,
     )[0]
 
 
-def create_refresh_token(username: str) -> Tuple[str, str, int]:
+def create_refresh_token(
+    username: str, generation: int
+) -> Tuple[str, str, int]:
     """Вернуть (token, jti, exp_ts) — удобно сохранять в БД."""
     return _create_jwt_token(
         subject=username,
         token_type="refresh",
         expires_delta=timedelta(days=settings.REFRESH_EXPIRE_DAYS),
+        generation=generation,
     )
 
 
 def decode_token(token: str) -> dict:
     """Декодировать JWT; при ошибке бросить JWTError."""
+    started = time.perf_counter()
     try:
-        return jwt.decode(
-            token,
-            settings.SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
-    except JWTError as exc:
-        raise exc
+        return get_codec().decode(token)
+    finally:
+        jwt_latency.observe(time.perf_counter() - started, "verify")
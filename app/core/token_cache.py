@@ -0,0 +1,99 @@
+"""
+Кеши проверки токенов: расшифрованные JWT (/introspect) и текущие
+token_generation сотрудников (claim gen).
+
+LRU расшифрованных JWT для /introspect.
+
+Ключ — sha256 токена (сам токен в памяти не держим), значение — payload
+и exp. Запись живёт не дольше exp токена, поэтому повторная проверка
+горячего токена не трогает подпись вовсе. Кешируются только валидные
+токены: мусор не вытесняет полезные записи.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+from jose import JWTError
+
+from app.config.settings import settings
+from app.core.security import decode_token
+
+
+class DecodedTokenCache:
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._items: OrderedDict[bytes, Tuple[float, dict]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def decode(self, token: str) -> dict:
+        """Как decode_token, но через кеш; JWTError для невалидных."""
+        key = hashlib.sha256(token.encode()).digest()
+        item = self._items.get(key)
+        if item is not None:
+            exp, payload = item
+            if exp > time.time():
+                self._items.move_to_end(key)
+                self.hits += 1
+                return payload
+            del self._items[key]
+            self.misses += 1
+            raise JWTError("Signature has expired.")
+        self.misses += 1
+        payload = decode_token(token)
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)) and self._max_size > 0:
+            self._items[key] = (exp, payload)
+            if len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+        return payload
+
+    def stats(self) -> dict:
+        return {"size": len(self._items), "hits": self.hits,
+                "misses": self.misses}
+
+
+class GenerationCache:
+    """
+    username → token_generation на ttl секунд. Сдвиг эпохи в этом воркере
+    сбрасывает запись сразу (forget), в остальных — по истечении ttl.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._items: OrderedDict[str, Tuple[float, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, username: str) -> int | None:
+        item = self._items.get(username)
+        if item is None:
+            return None
+        expires_at, generation = item
+        if expires_at < time.monotonic():
+            del self._items[username]
+            return None
+        self._items.move_to_end(username)
+        return generation
+
+    def set(self, username: str, generation: int) -> None:
+        if self._ttl <= 0:
+            return
+        self._items[username] = (time.monotonic() + self._ttl, generation)
+        self._items.move_to_end(username)
+        if len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def forget(self, username: str) -> None:
+        self._items.pop(username, None)
+
+
+decoded_tokens = DecodedTokenCache(settings.INTROSPECT_CACHE_SIZE)
+token_generations = GenerationCache(
+    settings.TOKEN_GENERATION_CACHE_SIZE, settings.TOKEN_GENERATION_CACHE_TTL)
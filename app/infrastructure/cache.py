@@ -0,0 +1,171 @@
+"""
+Read-through кеш для редко меняющихся справочных данных.
+
+Бэкенды: "memory" — LRU с TTL и ограничением размера (на воркер),
+"redis" — общий Redis-совместимый сервер (нужен пакет `redis`),
+"none" — кеш выключен. Значения — pydantic-схемы ответов, не ORM-объекты.
+Недоступный Redis — не ошибка запроса: чтение считается промахом (идём в
+БД), запись и инвалидация пропускаются с записью в лог.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from app.config.settings import settings
+
+log = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class CacheStats:
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+class NullCache:
+    """Кеш выключен: всегда промах."""
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    async def get(self, key: str, schema: Type[M]) -> M | None:
+        self.stats.misses += 1
+        return None
+
+    async def set(self, key: str, value: BaseModel) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        self.stats.invalidations += len(keys)
+
+    def size(self) -> int:
+        return 0
+
+
+class MemoryCache(NullCache):
+    """LRU + TTL; вытесняется самый давно читанный ключ."""
+
+    def __init__(self, *, max_size: int, ttl: float) -> None:
+        super().__init__()
+        self._max_size = max_size
+        self._ttl = ttl
+        self._items: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str, schema: Type[M]) -> M | None:
+        item = self._items.get(key)
+        if item is None:
+            self.stats.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._items[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: BaseModel) -> None:
+        self._items[key] = (time.monotonic() + self._ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._items.pop(key, None)
+        self.stats.invalidations += len(keys)
+
+    def size(self) -> int:
+        return len(self._items)
+
+
+class RedisCache(NullCache):
+    """Redis-совместимый сервер; TTL и вытеснение — на стороне сервера."""
+
+    def __init__(self, *, url: str, ttl: float, prefix: str = "auth:") -> None:
+        super().__init__()
+        try:
+            from redis import asyncio as aioredis
+            from redis.exceptions import RedisError
+        except ImportError as exc:  # pragma: no cover - опциональная зависимость
+            raise RuntimeError(
+                "CACHE_BACKEND=redis требует пакет `redis`") from exc
+        self._redis = aioredis.from_url(url)
+        self._errors = RedisError
+        self._ttl = int(ttl)
+        self._prefix = prefix
+
+    async def get(self, key: str, schema: Type[M]) -> M | None:
+        try:
+            raw = await self._redis.get(self._prefix + key)
+        except self._errors as exc:
+            self._failed("get", exc)
+            raw = None
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return schema.model_validate_json(raw)
+
+    async def set(self, key: str, value: BaseModel) -> None:
+        try:
+            await self._redis.set(
+                self._prefix + key, value.model_dump_json(), ex=self._ttl)
+        except self._errors as exc:
+            self._failed("set", exc)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            try:
+                await self._redis.delete(*(self._prefix + k for k in keys))
+            except self._errors as exc:  # значение доживёт до TTL
+                self._failed("delete", exc)
+        self.stats.invalidations += len(keys)
+
+    def _failed(self, op: str, exc: Exception) -> None:
+        self.stats.errors += 1
+        log.warning("Redis-кеш: %s не удался: %r", op, exc)
+
+    def size(self) -> int:
+        return -1  # неизвестно без обхода ключей
+
+
+def _build_cache() -> NullCache:
+    if settings.CACHE_BACKEND == "memory":
+        return MemoryCache(
+            max_size=settings.CACHE_MAX_SIZE, ttl=settings.CACHE_TTL)
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(url=settings.CACHE_REDIS_URL, ttl=settings.CACHE_TTL)
+    return NullCache()
+
+
+cache = _build_cache()
+
+
+# ── ключи ──────────────────────────────────────────────────────
+def employee_key(employee_id: int, only_active_companies: bool) -> str:
+    return f"emp:{employee_id}:{int(only_active_companies)}"
+
+
+def employee_keys(employee_id: int) -> Tuple[str, str]:
+    """Оба варианта (все / только активные компании) — для инвалидации."""
+    return employee_key(employee_id, False), employee_key(employee_id, True)
+
+
+def company_key(company_id: int) -> str:
+    return f"comp:{company_id}"
@@ -1,6 +1,83 @@
+from sqlalchemy import text
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy.ext.asyncio import AsyncAttrs
+from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncConnection, AsyncEngine
 
 
 class Base(AsyncAttrs, DeclarativeBase):
     __abstract__ = True
+
+
+# ── доводка существующих таблиц ────────────────────────────────
+# create_all не меняет уже созданные таблицы: колонки, добавленные в
+# модели позже, досоздаём здесь — (таблица, колонка, определение).
+_ADDED_COLUMNS = (
+    ("employees", "token_generation", "integer NOT NULL DEFAULT 0"),
+)
+
+
+async def upgrade_schema(conn: AsyncConnection) -> None:
+    """
+    Идемпотентно добавить недостающие колонки (старт каждого воркера).
+    ALTER TABLE берёт ACCESS EXCLUSIVE даже с IF NOT EXISTS, поэтому
+    сначала смотрим в information_schema и ALTER-им только при нужде;
+    advisory-блокировка сериализует параллельный старт воркеров.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                       {"key": "schema:upgrade"})
+    for table, column, ddl in _ADDED_COLUMNS:
+        present = await conn.scalar(text(
+            "SELECT EXISTS (SELECT 1 FROM information_schema.columns "
+            "WHERE table_schema = current_schema() "
+            "  AND table_name = :table AND column_name = :column)"
+        ), {"table": table, "column": column})
+        if not present:
+            await conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {ddl}"
+            ))
+
+
+# (индекс, таблица, определение) — те же, что объявлены в моделях
+_ADDED_INDEXES = (
+    ("ix_refresh_tokens_expires_at", "refresh_tokens", "(expires_at)"),
+    ("ix_refresh_tokens_revoked", "refresh_tokens", "(id) WHERE revoked"),
+)
+
+
+async def upgrade_indexes(engine: AsyncEngine) -> None:
+    """
+    Досоздать индексы на существующих таблицах. CREATE INDEX CONCURRENTLY
+    (вне транзакции) не блокирует запись на время сборки; строит один
+    воркер под сессионной advisory-блокировкой, недостроенный после сбоя
+    (INVALID) индекс пересобирается. Секционированную таблицу Postgres
+    CONCURRENTLY не индексирует — там обычный CREATE INDEX.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        key = {"key": "schema:indexes"}
+        await conn.execute(
+            text("SELECT pg_advisory_lock(hashtext(:key))"), key)
+        try:
+            for name, table, definition in _ADDED_INDEXES:
+                valid = await conn.scalar(text(
+                    "SELECT i.indisvalid FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :name "
+                    "  AND c.relnamespace = current_schema()::regnamespace"
+                ), {"name": name})
+                if valid:
+                    continue
+                partitioned = await conn.scalar(text(
+                    "SELECT relkind = 'p' FROM pg_class "
+                    "WHERE oid = CAST(:table AS regclass)"
+                ), {"table": table})
+                mode = "" if partitioned else "CONCURRENTLY "
+                if valid is False:
+                    await conn.execute(
+                        text(f"DROP INDEX {mode}IF EXISTS {name}"))
+                await conn.execute(text(
+                    f"CREATE INDEX {mode}IF NOT EXISTS {name} "
+                    f"ON {table} {definition}"
+                ))
+        finally:
+            await conn.execute(
+                text("SELECT pg_advisory_unlock(hashtext(:key))"), key)
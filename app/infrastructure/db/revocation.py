@@ -0,0 +1,261 @@
+"""
+Локальный (на воркер) фильтр отозванных refresh-токенов.
+
+Триггер на refresh_tokens шлёт NOTIFY с jti при каждом revoked → true
+(ротация, /logout); каждый воркер слушает канал и держит ограниченное
+множество недавно отозванных jti. /refresh отклоняет такие токены без
+запроса в БД. Фильтр только отсекает заведомо отозванные токены —
+пропущенное уведомление значит лишь, что решение примет БД.
+
+Проверка против локального Postgres (DATABASE_URL, таблицы созданы):
+
+    python -m app.infrastructure.db.revocation
+
+NOTIFY → jti в множестве; обрыв соединения слушателя
+(pg_terminate_backend) → переподключение → снова NOTIFY → jti в множестве.
+"""
+import asyncio
+import logging
+import sys
+import uuid
+from collections import OrderedDict
+
+import asyncpg
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.config.settings import settings
+
+log = logging.getLogger(__name__)
+
+
+# ── множество отозванных jti ───────────────────────────────────
+class RevokedJtiSet:
+    """Ограниченное множество jti; при переполнении вытесняются старые."""
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._items: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, jti: str) -> None:
+        self._items[jti] = None
+        self._items.move_to_end(jti)
+        if len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+
+# ── триггер NOTIFY ─────────────────────────────────────────────
+_FUNCTION_BODY = f"""
+BEGIN
+    PERFORM pg_notify('{settings.REVOCATION_CHANNEL}', NEW.jti);
+    RETURN NULL;
+END;
+"""
+
+_TRIGGER_DDL = (
+    "CREATE OR REPLACE FUNCTION notify_refresh_token_revoked() "
+    f"RETURNS trigger AS $${_FUNCTION_BODY}$$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS refresh_token_revoked ON refresh_tokens",
+    """
+    CREATE TRIGGER refresh_token_revoked
+    AFTER UPDATE OF revoked ON refresh_tokens
+    FOR EACH ROW
+    WHEN (NEW.revoked AND NOT OLD.revoked)
+    EXECUTE FUNCTION notify_refresh_token_revoked()
+    """,
+)
+
+# триггер на месте и функция шлёт в нужный канал
+_TRIGGER_CURRENT_SQL = text(
+    "SELECT EXISTS (SELECT 1 FROM pg_trigger t "
+    "JOIN pg_proc p ON p.oid = t.tgfoid "
+    "WHERE t.tgrelid = 'refresh_tokens'::regclass "
+    "  AND t.tgname = 'refresh_token_revoked' "
+    "  AND p.prosrc = :body)"
+)
+
+TRIGGER_LOCK_KEY = "refresh_tokens:revocation_trigger"
+
+
+async def install_revocation_trigger(conn: AsyncConnection) -> None:
+    """
+    Вызывается на старте каждого воркера в транзакции `conn`: под
+    advisory-блокировкой (параллельный старт не ловит «tuple concurrently
+    updated») и только если триггера нет или он устарел — DROP / CREATE
+    TRIGGER берут ACCESS EXCLUSIVE на refresh_tokens.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                       {"key": TRIGGER_LOCK_KEY})
+    if await conn.scalar(_TRIGGER_CURRENT_SQL, {"body": _FUNCTION_BODY}):
+        return
+    for ddl in _TRIGGER_DDL:
+        await conn.execute(text(ddl))
+    log.info("Триггер отзыва refresh-токенов установлен")
+
+
+async def drop_revocation_trigger(conn: AsyncConnection) -> None:
+    """
+    Фильтр выключен — NOTIFY на каждый отзыв не нужен (коммиты с NOTIFY
+    сериализуются). Не дёргаем DDL, если триггера и так нет.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                       {"key": TRIGGER_LOCK_KEY})
+    exists = await conn.scalar(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_trigger "
+        "WHERE tgrelid = 'refresh_tokens'::regclass "
+        "  AND tgname = 'refresh_token_revoked')"
+    ))
+    if exists:
+        await conn.execute(text(
+            "DROP TRIGGER IF EXISTS refresh_token_revoked ON refresh_tokens"))
+        log.info("Триггер отзыва refresh-токенов снят")
+
+
+# ── слушатель LISTEN ───────────────────────────────────────────
+class RevocationListener:
+    """
+    Выделенное asyncpg-соединение вне пула: LISTEN канала и
+    пополнение RevokedJtiSet. При обрыве переподключается и заново
+    прогревает множество из БД.
+    """
+
+    def __init__(
+        self,
+        revoked: RevokedJtiSet,
+        *,
+        dsn: str,
+        channel: str,
+        warmup_limit: int,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self.revoked = revoked
+        self._dsn = dsn
+        self._channel = channel
+        self._warmup_limit = warmup_limit
+        self._reconnect_delay = reconnect_delay
+        self._task: asyncio.Task | None = None
+        self._conn: asyncpg.Connection | None = None
+        self._lost: asyncio.Event | None = None
+        self.connected = asyncio.Event()
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ---------- HELPERS ----------
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("LISTEN %s: соединение потеряно", self._channel)
+            self.connected.clear()
+            await asyncio.sleep(self._reconnect_delay)
+
+    async def _listen_once(self) -> None:
+        self._lost = asyncio.Event()
+        self._conn = await asyncpg.connect(self._dsn)
+        try:
+            self._conn.add_termination_listener(
+                lambda _conn: self._lost.set())
+            await self._conn.add_listener(self._channel, self._on_notify)
+            # LISTEN уже активен — прогрев не пропустит новые отзывы
+            rows = await self._conn.fetch(
+                "SELECT jti FROM refresh_tokens "
+                "WHERE revoked AND expires_at > now() "
+                "ORDER BY id DESC LIMIT $1",
+                self._warmup_limit,
+            )
+            for row in reversed(rows):
+                self.revoked.add(row["jti"])
+            self.connected.set()
+            await self._lost.wait()
+        finally:
+            await self._conn.close(timeout=1)
+            self._conn = None
+
+    def _on_notify(self, _conn, _pid, _channel, payload: str) -> None:
+        self.revoked.add(payload)
+
+
+def _listener_dsn() -> str:
+    # postgresql+asyncpg://… → postgresql://… для голого asyncpg
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+revoked_jtis = RevokedJtiSet(settings.REVOCATION_FILTER_SIZE)
+
+revocation_listener = RevocationListener(
+    revoked_jtis,
+    dsn=_listener_dsn(),
+    channel=settings.REVOCATION_CHANNEL,
+    warmup_limit=settings.REVOCATION_FILTER_SIZE,
+)
+
+
+# ── самопроверка ───────────────────────────────────────────────
+async def self_check(dsn: str, timeout: float = 5.0) -> None:
+    """
+    Отдельный канал (триггер и живые воркеры не мешают), короткий
+    reconnect_delay; AssertionError / TimeoutError — проверка не прошла.
+    """
+    channel = f"revocation_check_{uuid.uuid4().hex[:8]}"
+    listener = RevocationListener(
+        RevokedJtiSet(100), dsn=dsn, channel=channel,
+        warmup_limit=0, reconnect_delay=0.1,
+    )
+    admin = await asyncpg.connect(dsn)
+
+    async def notify_and_wait(jti: str) -> None:
+        await admin.execute("SELECT pg_notify($1, $2)", channel, jti)
+        async with asyncio.timeout(timeout):
+            while jti not in listener.revoked:
+                await asyncio.sleep(0.01)
+
+    listener.start()
+    try:
+        async with asyncio.timeout(timeout):
+            await listener.connected.wait()
+        await notify_and_wait("check-before-drop")
+        print("notify → фильтр: ok")
+
+        pid = listener._conn.get_server_pid()
+        await admin.execute("SELECT pg_terminate_backend($1)", pid)
+        async with asyncio.timeout(timeout):
+            while listener.connected.is_set():  # обрыв замечен
+                await asyncio.sleep(0.01)
+            await listener.connected.wait()
+        assert listener._conn.get_server_pid() != pid, "не переподключился"
+        await notify_and_wait("check-after-reconnect")
+        assert "check-before-drop" in listener.revoked
+        print("обрыв → переподключение → notify: ok")
+    finally:
+        await listener.stop()
+        await admin.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(self_check(_listener_dsn()))
+    except (AssertionError, TimeoutError) as exc:
+        sys.exit(f"проверка не прошла: {exc!r}")
@@ -0,0 +1,272 @@
+"""
+Маршрутизация чтений на реплики.
+
+Методы репозиториев, помеченные @replica_read, в сессии из
+routed_session_maker идут на реплику (round-robin среди здоровых),
+всё остальное — на primary. Реплика не выбирается, если:
+
+- чтение идёт внутри уже начатой транзакции на primary
+  (например, get_by_id внутри update_employee);
+- в этой транзакции уже была запись;
+- клиент (affinity-ключ сессии) писал меньше DB_STICKY_PRIMARY_SECONDS
+  назад — читает свои записи;
+- здоровых реплик нет (проверка SELECT 1 + отставание репликации).
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List
+
+from fastapi import Request
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker,
+)
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.selectable import CTE
+
+from app.config.settings import settings
+from .session import async_session_maker, engine, make_engine, pool_stats
+
+log = logging.getLogger(__name__)
+
+_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE extract(epoch FROM now() - "
+    "pg_last_xact_replay_timestamp()) END"
+)
+
+
+# ── реплики и их здоровье ──────────────────────────────────────
+class ReplicaSet:
+    """Движки реплик, фоновая проверка здоровья и round-robin."""
+
+    def __init__(
+        self,
+        urls: List[str],
+        *,
+        check_interval: float,
+        max_lag: float,
+    ) -> None:
+        self.engines: List[AsyncEngine] = [make_engine(u) for u in urls]
+        self._healthy: List[AsyncEngine] = list(self.engines)
+        self._lag: Dict[int, float | None] = {}
+        self._next = 0
+        self._check_interval = check_interval
+        self._max_lag = max_lag
+        self._task: asyncio.Task | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for eng in self.engines:
+            await eng.dispose()
+
+    # ---------- ROUTING ----------
+    def pick(self) -> Engine | None:
+        """Следующая здоровая реплика или None (→ primary)."""
+        healthy = self._healthy
+        if not healthy:
+            return None
+        self._next = (self._next + 1) % len(healthy)
+        return healthy[self._next].sync_engine
+
+    # ---------- STATS ----------
+    def stats(self) -> List[dict]:
+        return [
+            {
+                "healthy": eng in self._healthy,
+                "lag": self._lag.get(i),
+                **pool_stats(eng),
+            }
+            for i, eng in enumerate(self.engines)
+        ]
+
+    # ---------- HELPERS ----------
+    async def check(self) -> None:
+        """
+        Все реплики параллельно; таймаут покрывает и connect, иначе
+        «чёрная дыра» по сети подвешивает проверку остальных.
+        """
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self._probe(eng), self._check_interval)
+              for eng in self.engines),
+            return_exceptions=True,
+        )
+        healthy = []
+        for i, (eng, lag) in enumerate(zip(self.engines, results)):
+            if isinstance(lag, BaseException):
+                log.warning("Реплика #%d недоступна", i, exc_info=lag)
+                self._lag[i] = None
+                continue
+            # NULL — это не реплика (например, primary в dev)
+            self._lag[i] = float(lag) if lag is not None else 0.0
+            if self._lag[i] <= self._max_lag:
+                healthy.append(eng)
+        if len(healthy) != len(self._healthy):
+            log.info("Здоровых реплик: %d из %d",
+                     len(healthy), len(self.engines))
+        self._healthy = healthy
+
+    @staticmethod
+    async def _probe(eng: AsyncEngine):
+        async with eng.connect() as conn:
+            return await conn.scalar(_LAG_SQL)
+
+    async def _run(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self._check_interval)
+
+
+class StickyWrites:
+    """Когда affinity-ключ писал последний раз (ограниченный LRU)."""
+
+    def __init__(self, seconds: float, max_size: int = 100_000) -> None:
+        self._seconds = seconds
+        self._max_size = max_size
+        self._until: OrderedDict[str, float] = OrderedDict()
+
+    def touch(self, key: str | None) -> None:
+        if key is None or self._seconds <= 0:
+            return
+        self._until[key] = time.monotonic() + self._seconds
+        self._until.move_to_end(key)
+        if len(self._until) > self._max_size:
+            self._until.popitem(last=False)
+
+    def active(self, key: str | None) -> bool:
+        if key is None:
+            return False
+        until = self._until.get(key)
+        return until is not None and until > time.monotonic()
+
+
+replicas = ReplicaSet(
+    [u.strip() for u in settings.DB_REPLICA_URLS.split(",") if u.strip()],
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+    max_lag=settings.DB_REPLICA_MAX_LAG,
+)
+sticky_writes = StickyWrites(settings.DB_STICKY_PRIMARY_SECONDS)
+
+
+# ── сессия ─────────────────────────────────────────────────────
+def _is_plain_select(clause) -> bool:
+    """SELECT без data-modifying CTE (как в RefreshTokenRepository.rotate)."""
+    if not isinstance(clause, Select):
+        return False
+    return not any(
+        isinstance(el, CTE) and el.element.is_dml
+        for el in visitors.iterate(clause)
+    )
+
+
+class RoutingSession(Session):
+    """
+    Sync-часть AsyncSession: get_bind выбирает движок на каждый запрос.
+    Флаги в session.info: read_only (ставит @replica_read), affinity
+    (ставит get_routed_db), replica / wrote (состояние транзакции).
+    """
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        info = self.info
+        if self._flushing or not _is_plain_select(clause):
+            info["wrote"] = True
+            sticky_writes.touch(info.get("affinity"))
+        elif (
+            info.get("read_only")
+            and not info.get("wrote")
+            and not sticky_writes.active(info.get("affinity"))
+        ):
+            # одна реплика на транзакцию — соединение не плодим
+            replica = info.get("replica") or replicas.pick()
+            if replica is not None:
+                info["replica"] = replica
+                return replica
+        return engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_route(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("replica", None)
+        session.info.pop("wrote", None)
+
+
+routed_session_maker = (
+    async_sessionmaker(
+        engine,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+    )
+    if replicas else async_session_maker
+)
+
+
+# ── пометка методов репозитория ───────────────────────────────
+def _may_use_replica(session: AsyncSession) -> bool:
+    # внутри транзакции на primary читаем там же, иначе потеряем свои
+    # незакоммиченные записи и блокировки
+    return not session.in_transaction() or "replica" in session.info
+
+
+def replica_read(fn):
+    """Метод репозитория только читает — можно выполнить на реплике."""
+    if inspect.isasyncgenfunction(fn):
+        @functools.wraps(fn)
+        async def gen_wrapper(self, *args, **kwargs) -> AsyncIterator:
+            info = self.session.info
+            prev = info.get("read_only")
+            info["read_only"] = _may_use_replica(self.session)
+            try:
+                async for item in fn(self, *args, **kwargs):
+                    yield item
+            finally:
+                info["read_only"] = prev
+        return gen_wrapper
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        info = self.session.info
+        prev = info.get("read_only")
+        info["read_only"] = _may_use_replica(self.session)
+        try:
+            return await fn(self, *args, **kwargs)
+        finally:
+            info["read_only"] = prev
+    return wrapper
+
+
+# ── зависимость FastAPI ────────────────────────────────────────
+def affinity_key(request: Request) -> str:
+    """Клиент для «читай свои записи»: учётные данные, иначе IP."""
+    cred = (request.headers.get("authorization")
+            or request.headers.get("x-admin-key"))
+    if cred:
+        return hashlib.sha256(cred.encode()).hexdigest()[:32]
+    return request.client.host if request.client else "-"
+
+
+async def get_routed_db(request: Request) -> AsyncSession:
+    async with routed_session_maker() as session:
+        session.info["affinity"] = affinity_key(request)
+        yield session
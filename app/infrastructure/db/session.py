@@ -1,21 +1,50 @@
+import uuid
+
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
+    AsyncEngine,
     AsyncSession,
 )
 
 from app.config.settings import settings  # SECRET, URL и т.п.
 
-# Асинхронный движок
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=True,                        # DEBUG-вывод SQL
-    connect_args={
+
+def _connect_args() -> dict:
+    args: dict = {
         "server_settings": {
             "timezone": "Europe/Moscow",
-        }
-    },
-)
+        },
+    }
+    if settings.DB_PGBOUNCER:
+        # PgBouncer (transaction pooling) не сохраняет prepared statements
+        # между транзакциями: отключаем оба кеша и делаем имена уникальными
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = (
+            lambda: f"__asyncpg_{uuid.uuid4()}__"
+        )
+    else:
+        args["prepared_statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    return args
+
+
+def make_engine(url: str) -> AsyncEngine:
+    """Движок с общими настройками пула (основной и реплики)."""
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,            # DEBUG-вывод SQL
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(),
+    )
+
+
+# Асинхронный движок (primary)
+engine = make_engine(settings.DATABASE_URL)
 
 # Фабрика сессий
 async_session_maker = async_sessionmaker(
@@ -23,9 +52,28 @@ async_session_maker = async_sessionmaker(
     expire_on_commit=False,
 )
 
+
+def pool_stats(target: AsyncEngine | None = None) -> dict:
+    """Текущая загрузка пула соединений (для /health и метрик)."""
+    pool = (target or engine).pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "timeout": settings.DB_POOL_TIMEOUT,
+    }
+
 # Зависимость FastAPI
 
 
 async def get_db() -> AsyncSession:
+    """
+    Сессия на запрос. Соединение из пула берётся при первом запросе к
+    БД и возвращается на commit/rollback/close — эндпоинт, отклонивший
+    запрос раньше, пул не трогает. Проверки заголовков и токенов —
+    в зависимостях, объявленных до get_db (см. app.api.deps).
+    """
     async with async_session_maker() as session:
         yield session
@@ -0,0 +1,289 @@
+"""
+Метрики в текстовом формате Prometheus — без внешних зависимостей.
+
+Серии создаются один раз на набор меток (маршруты, типы запросов —
+конечные множества), дальше наблюдение — это bisect по фиксированным
+границам и пара инкрементов под локом. Гистограммы хеширования и JWT
+пополняются и из потоков пула хеширования, поэтому лок нужен.
+
+Что собираем:
+- http_request_duration_seconds{method,route,status}
+- db_statement_duration_seconds{engine,kind} (события движка SQLAlchemy)
+- password_hash_duration_seconds{op} (hash / verify)
+- jwt_duration_seconds{op} (sign / verify)
+- db_pool_checked_out / db_pool_overflow {engine} (на момент скрейпа)
+- event_loop_lag_seconds (гистограмма + последнее значение)
+"""
+import asyncio
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config.settings import settings
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+    2.5, 5.0, 10.0,
+)
+FAST_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001,
+    0.0025, 0.005, 0.01,
+)
+
+
+def _escape(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n"))
+
+
+def _labels(names: Sequence[str], values: Sequence[str],
+            extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# ── типы метрик ────────────────────────────────────────────────
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # метки → [счётчики по корзинам (+Inf последней), сумма]
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series.setdefault(
+                labels, [[0] * (len(self.buckets) + 1), 0.0])
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series[0][idx] += 1
+            series[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lbl = _labels(self.labelnames, labels, f'le="{le}"')
+                yield f"{self.name}_bucket{lbl} {cumulative}"
+            lbl = _labels(self.labelnames, labels)
+            yield f"{self.name}_sum{lbl} {total}"
+            yield f"{self.name}_count{lbl} {cumulative}"
+
+
+class GaugeFunc:
+    """Значения считаются в момент скрейпа: fn() → {метки: значение}."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str],
+        fn: Callable[[], Dict[Tuple[str, ...], float]],
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._fn = fn
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        for labels, value in self._fn().items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(
+            line for m in self._metrics for line in m.render()) + "\n"
+
+
+registry = Registry()
+
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса",
+    ("method", "route", "status"),
+))
+db_latency = registry.register(Histogram(
+    "db_statement_duration_seconds", "Время выполнения SQL-выражения",
+    ("engine", "kind"),
+))
+hash_latency = registry.register(Histogram(
+    "password_hash_duration_seconds", "Время хеша пароля (hash / verify)",
+    ("op",),
+))
+jwt_latency = registry.register(Histogram(
+    "jwt_duration_seconds", "Время подписи / проверки JWT",
+    ("op",), buckets=FAST_BUCKETS,
+))
+loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "Запаздывание event loop",
+    buckets=FAST_BUCKETS + (0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+))
+
+
+# ── SQL через события движка ───────────────────────────────────
+_engines: Dict[str, AsyncEngine] = {}
+
+
+# первое DML-слово внутри WITH …: data-modifying CTE — это запись
+# (ротация refresh-токена); SELECT … FOR [NO KEY] UPDATE — не она
+_CTE_DML = re.compile(r"\b(INSERT|DELETE)\b|(?<!FOR )(?<!KEY )\bUPDATE\b")
+
+
+def _statement_kind(statement: str, context) -> str:
+    if context is not None:
+        if context.isinsert:
+            return "insert"
+        if context.isupdate:
+            return "update"
+        if context.isdelete:
+            return "delete"
+    if statement.startswith("WITH"):
+        match = _CTE_DML.search(statement)
+        return match.group(0).lower() if match else "select"
+    if statement.startswith("SELECT"):
+        return "select"
+    return "other"
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Время каждого SQL-выражения + gauges пула для этого движка."""
+    _engines[name] = engine
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, params, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, params, context, executemany):
+        started = conn.info["query_start"].pop()
+        db_latency.observe(
+            time.perf_counter() - started,
+            name, _statement_kind(statement, context),
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exc_context):
+        conn = exc_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+def _pool_gauge(attr: str) -> Callable[[], Dict[Tuple[str, ...], float]]:
+    return lambda: {
+        (name,): getattr(eng.pool, attr)()
+        for name, eng in _engines.items()
+    }
+
+
+registry.register(GaugeFunc(
+    "db_pool_checked_out", "Соединений выдано из пула", ("engine",),
+    _pool_gauge("checkedout"),
+))
+registry.register(GaugeFunc(
+    "db_pool_overflow", "Соединений сверх pool_size (отрицательное — "
+    "свободные слоты до pool_size)", ("engine",), _pool_gauge("overflow"),
+))
+
+
+# ── HTTP middleware ────────────────────────────────────────────
+class MetricsMiddleware:
+    """
+    Чистый ASGI (без BaseHTTPMiddleware): маршрут берём из
+    scope["route"], который FastAPI кладёт при сопоставлении, — метка
+    ограничена шаблонами путей, а не сырыми URL.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            http_latency.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                str(status),
+            )
+
+
+# ── лаг event loop ─────────────────────────────────────────────
+class LoopLagMonitor:
+    """Раз в interval засыпает и меряет, насколько проснулся позже."""
+
+    def __init__(self, interval: float) -> None:
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+        self.last = 0.0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self._interval
+            await asyncio.sleep(self._interval)
+            self.last = max(0.0, time.perf_counter() - expected)
+            loop_lag.observe(self.last)
+
+
+loop_lag_monitor = LoopLagMonitor(settings.METRICS_LOOP_LAG_INTERVAL)
+
+registry.register(GaugeFunc(
+    "event_loop_lag_last_seconds", "Последний замер лага event loop", (),
+    lambda: {(): loop_lag_monitor.last},
+))
@@ -0,0 +1,197 @@
+"""
+Профилирование отдельных запросов (по требованию).
+
+Включается PROFILING_ENABLED; без него middleware и слушатели движка не
+регистрируются вовсе. Запрос профилируется, если пришёл с заголовком
+`X-Profile: 1` и верным X-Admin-Key либо попал в выборку
+PROFILING_SAMPLE_RATE. Для него собираются:
+
+- cProfile вызовов в event loop (jose, сериализация, ORM, роутинг);
+- SQL-выражения с длительностью (события движка);
+- ожидание пула хеширования (PBKDF2 идёт в других потоках и в cProfile
+  не видна) — спаны из PasswordHasherPool.
+
+Артефакты — `<id>.json` (сводка + топ функций) и `<id>.prof` (pstats,
+открывается snakeviz / pstats) в PROFILING_DIR; id — в заголовке ответа
+X-Profile-Id, скачать — /api/v1/profiles/<id>. Одновременно
+профилируется один запрос: cProfile видит весь поток, так что корутины
+параллельных запросов тоже попадут в профиль.
+"""
+import asyncio
+import cProfile
+import hmac
+import json
+import pstats
+import random
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config.settings import settings
+
+TOP_FUNCTIONS = 40
+
+
+class RequestProfile:
+    """Спаны одного профилируемого запроса."""
+
+    def __init__(self, method: str, path: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.spans: List[dict] = []
+
+    def span(self, kind: str, started: float, **extra) -> None:
+        self.spans.append({
+            "kind": kind,
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+            **extra,
+        })
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "current_profile", default=None)
+
+
+# ── SQL ────────────────────────────────────────────────────────
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, params, context, executemany):
+        if current_profile.get() is not None:
+            conn.info["profile_start"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, params, context, executemany):
+        profile = current_profile.get()
+        started = conn.info.pop("profile_start", None)
+        if profile is not None and started is not None:
+            profile.span("sql", started, engine=name, statement=statement)
+
+
+# ── хранилище артефактов ───────────────────────────────────────
+class ProfileStore:
+    def __init__(self, directory: str, max_artifacts: int) -> None:
+        self.dir = Path(directory)
+        self._max = max_artifacts
+
+    def path(self, profile_id: str, suffix: str) -> Path | None:
+        if not profile_id.isalnum():  # id — uuid4().hex; без «../»
+            return None
+        path = self.dir / f"{profile_id}{suffix}"
+        return path if path.is_file() else None
+
+    def list(self) -> List[dict]:
+        items = []
+        for path in sorted(self.dir.glob("*.json"), reverse=True,
+                           key=lambda p: p.stat().st_mtime):
+            summary = json.loads(path.read_text())
+            summary.pop("spans", None)
+            summary.pop("top", None)
+            items.append(summary)
+        return items
+
+    def save(self, profile: RequestProfile, profiler: cProfile.Profile,
+             status: int, wall: float) -> None:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(self.dir / f"{profile.id}.prof")
+        stats = pstats.Stats(profiler)
+        top = sorted(stats.stats.items(), key=lambda kv: kv[1][3],
+                     reverse=True)[:TOP_FUNCTIONS]
+        summary = {
+            "id": profile.id,
+            "method": profile.method,
+            "path": profile.path,
+            "status": status,
+            "started_at": profile.started_at.isoformat(),
+            "wall_ms": round(wall * 1000, 3),
+            "sql_ms": round(sum(
+                s["ms"] for s in profile.spans if s["kind"] == "sql"), 3),
+            "hash_ms": round(sum(
+                s["ms"] for s in profile.spans if s["kind"] == "hash"), 3),
+            "spans": profile.spans,
+            "top": [
+                {
+                    "function": f"{file}:{line}({func})",
+                    "calls": nc,
+                    "tottime_ms": round(tt * 1000, 3),
+                    "cumtime_ms": round(ct * 1000, 3),
+                }
+                for (file, line, func), (_cc, nc, tt, ct, _callers) in top
+            ],
+        }
+        (self.dir / f"{profile.id}.json").write_text(
+            json.dumps(summary, ensure_ascii=False, indent=2))
+        self._prune()
+
+    def _prune(self) -> None:
+        artifacts = sorted(self.dir.glob("*.json"),
+                           key=lambda p: p.stat().st_mtime)
+        for path in artifacts[:-self._max or None]:
+            path.unlink(missing_ok=True)
+            path.with_suffix(".prof").unlink(missing_ok=True)
+
+
+profile_store = ProfileStore(
+    settings.PROFILING_DIR, settings.PROFILING_MAX_ARTIFACTS)
+
+
+# ── middleware ─────────────────────────────────────────────────
+def _requested(scope) -> bool:
+    headers = dict(scope["headers"])
+    if headers.get(b"x-profile") != b"1" or not settings.ADMIN_API_KEY:
+        return False
+    key = headers.get(b"x-admin-key", b"")
+    return hmac.compare_digest(key, settings.ADMIN_API_KEY.encode())
+
+
+class ProfilingMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+        self._busy = False
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            scope["type"] != "http"
+            or self._busy
+            or not (_requested(scope)
+                    or random.random() < settings.PROFILING_SAMPLE_RATE)
+        ):
+            return await self.app(scope, receive, send)
+
+        self._busy = True
+        profile = RequestProfile(scope["method"], scope["path"])
+        token = current_profile.set(profile)
+        status = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = [
+                    *message["headers"],
+                    (b"x-profile-id", profile.id.encode()),
+                ]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            wall = time.perf_counter() - started
+            current_profile.reset(token)
+            self._busy = False
+            await asyncio.to_thread(
+                profile_store.save, profile, profiler, status, wall)
@@ -0,0 +1,161 @@
+"""
+Ограничение частоты попыток входа — до похода в БД и PBKDF2.
+
+Бэкенды: "memory" — token bucket на воркер, ключи разложены по шардам,
+в каждом LRU с вытеснением холодных ключей; "redis" — общий для всех
+воркеров счётчик в минутном окне (INCR + EXPIRE, нужен пакет `redis`).
+Бакет: ёмкость `burst`, пополнение `per_minute` токенов в минуту.
+"""
+import logging
+import time
+from collections import OrderedDict
+from typing import List, Tuple
+
+from app.config.settings import settings
+
+log = logging.getLogger(__name__)
+
+
+class TokenBucketLimiter:
+    """In-memory token bucket; hit() — пара арифметических операций."""
+
+    def __init__(
+        self,
+        *,
+        per_minute: float,
+        burst: int,
+        max_keys: int,
+        shards: int = 16,
+    ) -> None:
+        self._rate = per_minute / 60.0
+        self._burst = float(burst)
+        self._shards: List[OrderedDict[str, List[float]]] = [
+            OrderedDict() for _ in range(shards)
+        ]
+        self._shard_max = max(1, max_keys // shards)
+
+    def size(self) -> int | None:
+        return sum(len(s) for s in self._shards)
+
+    async def hit(self, key: str) -> float:
+        """Списать попытку; 0 — можно, иначе секунд до следующей."""
+        shard = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        bucket = shard.get(key)
+        if bucket is None:
+            bucket = shard[key] = [self._burst, now]
+            if len(shard) > self._shard_max:
+                shard.popitem(last=False)  # самый давно не виденный ключ
+        else:
+            shard.move_to_end(key)
+            bucket[0] = min(
+                self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+            bucket[1] = now
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        return (1.0 - bucket[0]) / self._rate if self._rate else 60.0
+
+
+class RedisWindowLimiter:
+    """
+    Общий для воркеров лимит: не больше per_minute попыток в минуту.
+    Redis недоступен — решает локальный `fallback` (лимит на воркер),
+    вход не превращается в 500.
+    """
+
+    def __init__(self, *, url: str, per_minute: float,
+                 fallback: TokenBucketLimiter,
+                 prefix: str = "auth:rl:") -> None:
+        try:
+            from redis import asyncio as aioredis
+            from redis.exceptions import RedisError
+        except ImportError as exc:  # pragma: no cover - опциональная зависимость
+            raise RuntimeError(
+                "LOGIN_THROTTLE_BACKEND=redis требует пакет `redis`") from exc
+        self._redis = aioredis.from_url(url)
+        self._errors = RedisError
+        self._fallback = fallback
+        self._limit = int(per_minute)
+        self._prefix = prefix
+        self.errors = 0
+
+    def size(self) -> int | None:
+        return None  # неизвестно без обхода ключей
+
+    async def hit(self, key: str) -> float:
+        window = int(time.time() // 60)
+        rkey = f"{self._prefix}{key}:{window}"
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                count, _ = await pipe.incr(rkey).expire(rkey, 60).execute()
+        except self._errors as exc:
+            self.errors += 1
+            log.warning("Лимитер входа: Redis недоступен (%r), "
+                        "лимит на воркер", exc)
+            return await self._fallback.hit(key)
+        if count <= self._limit:
+            return 0.0
+        return 60.0 - time.time() % 60
+
+
+class LoginThrottle:
+    """Два лимита на /login: по IP клиента и по имени пользователя."""
+
+    def __init__(self, by_ip, by_username) -> None:
+        self.by_ip = by_ip
+        self.by_username = by_username
+
+    async def check(self, ip: str, username: str) -> float:
+        """0 — пускаем; иначе Retry-After в секундах."""
+        wait = await self.by_ip.hit(f"ip:{ip}")
+        if wait:  # бакет имени не тратим на уже отклонённый запрос
+            return wait
+        return await self.by_username.hit(f"u:{username.lower()}")
+
+    def stats(self) -> dict:
+        """Число отслеживаемых ключей; None — бэкенд его не знает."""
+        return {"ip_keys": self.by_ip.size(),
+                "username_keys": self.by_username.size()}
+
+
+def _build(per_minute: float, burst: int):
+    local = TokenBucketLimiter(
+        per_minute=per_minute,
+        burst=burst,
+        max_keys=settings.LOGIN_THROTTLE_MAX_KEYS,
+        shards=settings.LOGIN_THROTTLE_SHARDS,
+    )
+    if settings.LOGIN_THROTTLE_BACKEND == "redis":
+        return RedisWindowLimiter(
+            url=settings.LOGIN_THROTTLE_REDIS_URL or settings.CACHE_REDIS_URL,
+            per_minute=per_minute,
+            fallback=local,
+        )
+    return local
+
+
+login_throttle = LoginThrottle(
+    by_ip=_build(settings.LOGIN_IP_PER_MINUTE, settings.LOGIN_IP_BURST),
+    by_username=_build(
+        settings.LOGIN_USERNAME_PER_MINUTE, settings.LOGIN_USERNAME_BURST),
+)
+
+
+def client_ip(headers, peer: Tuple[str, int] | None) -> str:
+    """
+    IP клиента; X-Forwarded-For — только если прокси доверенный. Каждый
+    прокси дописывает адрес справа, левые записи присылает сам клиент:
+    берём запись, добавленную самым дальним из своих прокси
+    (LOGIN_TRUSTED_PROXY_HOPS с конца).
+    """
+    hops = settings.LOGIN_TRUSTED_PROXY_HOPS
+    if settings.LOGIN_TRUST_FORWARDED_FOR and hops > 0:
+        forwarded = [
+            part.strip()
+            for header in headers.getlist("x-forwarded-for")
+            for part in header.split(",")
+        ]
+        if len(forwarded) >= hops and forwarded[-hops]:
+            return forwarded[-hops]
+    return peer[0] if peer else "-"
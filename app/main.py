@@ -1,17 +1,59 @@
-from fastapi import FastAPI
+import asyncio
+import inspect
+import logging
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
 from app.config.settings import settings
+from app.core.hashing import HashingOverloaded, password_hasher
+from app.core.jwt_codec import get_codec
+from app.core.password_policy import calibrate, set_method
 from app.infrastructure.db.session import engine
-from app.infrastructure.db.base import Base
+from app.infrastructure.db.base import (
+    Base, upgrade_indexes, upgrade_schema,
+)
+from app.infrastructure.db.routing import replicas
+from app.infrastructure.db.revocation import (
+    drop_revocation_trigger,
+    install_revocation_trigger,
+    revocation_listener,
+)
+from app.infrastructure.metrics import (
+    MetricsMiddleware,
+    instrument_engine,
+    loop_lag_monitor,
+)
+from app.infrastructure import profiling
+from app.services.last_login import last_login_recorder
+from app.services.password_rehash import password_rehasher
+from app.services.refresh_token_batcher import refresh_token_batcher
+from app.services.token_reaper import token_reaper
 
 # важно: чтобы таблицы «увиделись», импортируем модели
 from app.models import *  # noqa
 
+log = logging.getLogger(__name__)
+
 # — FastAPI-приложение —
 app = FastAPI(
     title="Token microservice",
     debug=settings.DEBUG,
 )
 
+# — метрики: SQL по событиям движков, HTTP — ASGI-middleware —
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "primary")
+    for i, replica in enumerate(replicas.engines):
+        instrument_engine(replica, f"replica-{i}")
+    app.add_middleware(MetricsMiddleware)
+
+# — профилирование по запросу: без флага не стоит ничего —
+if settings.PROFILING_ENABLED:
+    profiling.instrument_engine(engine, "primary")
+    for i, replica in enumerate(replicas.engines):
+        profiling.instrument_engine(replica, f"replica-{i}")
+    app.add_middleware(profiling.ProfilingMiddleware)
+
 # — стартап / шатдаун —
 
 
@@ -20,12 +62,78 @@ async def startup() -> None:
     """В DEV-режиме создаём таблицы на лету."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await upgrade_schema(conn)
+        if settings.REVOCATION_FILTER_ENABLED:
+            await install_revocation_trigger(conn)
+        else:
+            await drop_revocation_trigger(conn)
+    await upgrade_indexes(engine)
+    await token_reaper.ensure_partitions()
+    password_hasher.start()
+    if settings.PASSWORD_HASH_TARGET_MS > 0:  # стоимость под это железо
+        set_method(await asyncio.to_thread(
+            calibrate,
+            settings.PASSWORD_HASH_ALGORITHM,
+            settings.PASSWORD_HASH_TARGET_MS,
+        ))
+    get_codec()  # битые ключи / неизвестный бэкенд — падаем сразу
+    replicas.start()
+    if settings.METRICS_ENABLED:
+        loop_lag_monitor.start()
+    if settings.REVOCATION_FILTER_ENABLED:
+        revocation_listener.start()
+    if settings.REFRESH_PURGE_ENABLED or settings.REFRESH_TOKENS_PARTITIONED:
+        token_reaper.start()
+    if settings.LAST_LOGIN_TRACKING:
+        last_login_recorder.start()
 
 
 @app.on_event("shutdown")
 async def shutdown() -> None:
-    await engine.dispose()
+    """Шаги независимы: сбой одного не оставляет открытыми остальные."""
+    for step in (
+        loop_lag_monitor.stop,
+        refresh_token_batcher.close,
+        last_login_recorder.stop,
+        password_rehasher.stop,
+        token_reaper.stop,
+        revocation_listener.stop,
+        password_hasher.shutdown,
+        replicas.stop,
+        engine.dispose,
+    ):
+        try:
+            result = step()
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            log.exception("Шаг остановки %s не удался", step.__qualname__)
+
+
+# — перегрузка пула хеширования → 503 —
 
-# — только auth-роутер —
-from app.api.routers.v1 import auth  # noqa
+
+@app.exception_handler(HashingOverloaded)
+async def hashing_overloaded_handler(
+    request: Request, exc: HashingOverloaded
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Сервис перегружен, повторите попытку позже"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+# — роутеры —
+from app.api.routers import metrics, well_known  # noqa
+from app.api.routers.v1 import (  # noqa
+    auth, companies, employees, health, profiles,
+)
 app.include_router(auth.router, prefix="/api/v1")
+app.include_router(employees.router, prefix="/api/v1")
+app.include_router(companies.router, prefix="/api/v1")
+app.include_router(health.router, prefix="/api/v1")
+if settings.PROFILING_ENABLED:
+    app.include_router(profiles.router, prefix="/api/v1")
+app.include_router(well_known.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
@@ -29,5 +29,5 @@ class CompanyModel(Base):
         'EmployeeModel',
         secondary=employees_companies,
         back_populates='companies',
-        lazy='selectin'
+        lazy='raise'           # грузим явно через options() в запросе
     )
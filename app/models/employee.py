@@ -20,11 +20,11 @@ class EmployeeModel(Base):
         default=utc_now,
         onupdate=utc_now
     )
+    # пишется пачками из LastLoginRecorder, не при каждом UPDATE строки
     last_login = Column(
         DateTime(timezone=True),
         nullable=False,
         default=utc_now,
-        onupdate=utc_now
     )
 
     username = Column(String(150), unique=True, nullable=False)
@@ -34,17 +34,22 @@ class EmployeeModel(Base):
     patronymic = Column(String(100), nullable=False)
     status = Column(String(30), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    # эпоха сессий: попадает в токены как `gen`, инкремент = «выйти везде»
+    token_generation = Column(
+        Integer, default=0, server_default="0", nullable=False
+    )
 
     companies = relationship(
         'CompanyModel',
         secondary=employees_companies,
         back_populates='employees',
-        lazy='selectin'
+        lazy='raise'           # грузим явно через options() в запросе
     )
 
     refresh_tokens = relationship(
         "RefreshTokenModel",
         back_populates="employee",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        passive_deletes=True,  # строки удаляет БД / bulk DELETE
+        lazy="raise",          # коллекция растёт бесконечно — только явно
     )
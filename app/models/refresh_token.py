@@ -1,20 +1,48 @@
-from sqlalchemy import Column, DateTime, Boolean, Integer, String, ForeignKey
+from sqlalchemy import (
+    Column, DateTime, Boolean, Index, Integer, String, ForeignKey,
+    UniqueConstraint, text,
+)
 from sqlalchemy.orm import relationship
+from app.config.settings import settings
 from app.core.time_utils import utc_now
 from app.infrastructure.db.base import Base
 
+# секции по expires_at: ключ секции обязан входить в PK и UNIQUE
+_PARTITIONED = settings.REFRESH_TOKENS_PARTITIONED
+
+
+# под чистку (RefreshTokenRepository.purge_batch): истёкшие — диапазоном
+# по expires_at, отозванные — частичным индексом, без seq scan таблицы
+_PURGE_INDEXES = (
+    Index("ix_refresh_tokens_expires_at", "expires_at"),
+    Index("ix_refresh_tokens_revoked", "id",
+          postgresql_where=text("revoked")),
+)
+
 
 class RefreshTokenModel(Base):
     __tablename__ = "refresh_tokens"
+    if _PARTITIONED:
+        __table_args__ = (
+            *_PURGE_INDEXES,
+            UniqueConstraint("jti", "expires_at"),
+            {"postgresql_partition_by": "RANGE (expires_at)"},
+        )
+    else:
+        __table_args__ = _PURGE_INDEXES
 
-    id = Column(Integer, primary_key=True, index=True)
-    jti = Column(String(36), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    jti = Column(String(36), unique=not _PARTITIONED,
+                 nullable=False, index=True)
     employee_id = Column(Integer, ForeignKey(
-        "employees.id"), nullable=False, index=True)
+        "employees.id", ondelete="CASCADE"), nullable=False, index=True)
 
-    expires_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False,
+                        primary_key=_PARTITIONED)
     revoked = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True),
                         nullable=False, default=utc_now)
 
-    employee = relationship("EmployeeModel", back_populates="refresh_tokens")
+    employee = relationship(
+        "EmployeeModel", back_populates="refresh_tokens", lazy="raise"
+    )
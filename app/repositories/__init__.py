@@ -1,5 +1,8 @@
 from .company import CompanyRepository
 from .employee import EmployeeRepository
+from .refresh_token import RefreshTokenRepository
 
 
-__all__ = ["CompanyRepository", "EmployeeRepository"]
+__all__ = [
+    "CompanyRepository", "EmployeeRepository", "RefreshTokenRepository"
+]
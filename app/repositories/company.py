@@ -1,9 +1,11 @@
-from typing import Optional
+from typing import AsyncIterator, Iterable, List, Optional, Sequence
 
-from sqlalchemy import select, update
+from sqlalchemy import Select, delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import CompanyModel
+from app.infrastructure.db.routing import replica_read
+from app.models import CompanyModel, EmployeeModel, employees_companies
+from .membership import MembershipRepository
 
 
 class CompanyRepository:
@@ -13,12 +15,52 @@ class CompanyRepository:
         self.session = session
 
     # ---------- GET ----------
+    @replica_read
     async def get_by_id(self, company_id: int) -> Optional[CompanyModel]:
         res = await self.session.execute(
             select(CompanyModel).where(CompanyModel.id == company_id)
         )
         return res.scalar_one_or_none()
 
+    # ---------- LIST ----------
+    @replica_read
+    async def list_page(
+        self,
+        *,
+        after_id: int = 0,
+        limit: int = 100,
+        is_active: bool | None = None,
+    ) -> Sequence[CompanyModel]:
+        """Keyset-пагинация по id: WHERE id > :after ORDER BY id LIMIT n."""
+        res = await self.session.execute(
+            self._list_stmt(is_active)
+            .where(CompanyModel.id > after_id)
+            .limit(limit)
+        )
+        return res.scalars().all()
+
+    @replica_read
+    async def stream_all(
+        self,
+        *,
+        is_active: bool | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[CompanyModel]]:
+        """Весь список серверным курсором, пачками по batch_size."""
+        res = await self.session.stream_scalars(
+            self._list_stmt(is_active)
+            .execution_options(yield_per=batch_size)
+        )
+        async for part in res.partitions():
+            yield part
+
+    @staticmethod
+    def _list_stmt(is_active: bool | None) -> Select:
+        stmt = select(CompanyModel).order_by(CompanyModel.id)
+        if is_active is not None:
+            stmt = stmt.where(CompanyModel.is_active.is_(is_active))
+        return stmt
+
     # ---------- CREATE ----------
     async def create(self, company: CompanyModel) -> CompanyModel:
         async with self.session.begin():
@@ -38,12 +80,31 @@ class CompanyRepository:
     # ---------- DELETE ----------
     async def delete(self, company_id: int) -> bool:
         async with self.session.begin():
-            comp = await self.get_by_id(company_id)
-            if not comp:
-                return False
-            comp.employees.clear()      # разрыв M-N
-            await self.session.delete(comp)
-        return True
+            await MembershipRepository(self.session).unlink_company(
+                company_id)
+            res = await self.session.execute(
+                delete(CompanyModel)
+                .where(CompanyModel.id == company_id)
+                .returning(CompanyModel.id)
+            )
+            return res.scalar_one_or_none() is not None
+
+    # ---------- MEMBERS ----------
+    async def add_members(
+        self, company_id: int, employee_ids: Iterable[int]
+    ) -> int:
+        """Массово привязать сотрудников; вернуть число новых связей."""
+        async with self.session.begin():
+            return await MembershipRepository(self.session).add_members(
+                company_id, employee_ids)
+
+    async def remove_members(
+        self, company_id: int, employee_ids: Iterable[int]
+    ) -> int:
+        """Массово отвязать сотрудников; вернуть число удалённых связей."""
+        async with self.session.begin():
+            return await MembershipRepository(self.session).remove_members(
+                company_id, employee_ids)
 
     # ---------- DEACTIVATE ----------
     async def disactivate_by_id(self, company_id: int) -> bool:
@@ -55,3 +116,62 @@ class CompanyRepository:
                 .returning(CompanyModel.id)
             )
             return res.scalar_one_or_none() is not None
+
+    async def disactivate_and_revoke_sessions(
+        self, company_id: int
+    ) -> Optional[int]:
+        """
+        Деактивировать компанию и в той же транзакции отозвать сессии
+        сотрудников, у которых не осталось ни одной активной компании:
+
+            UPDATE employees SET token_generation = token_generation + 1
+            FROM employees_companies ec
+            WHERE ec.company_id = :id AND employees.id = ec.employee_id
+              AND employees.is_active
+              AND NOT EXISTS (активная компания среди остальных связей)
+
+        Сдвиг эпохи делает недействительными все их refresh-токены без
+        перебора строк refresh_tokens. Вернуть число затронутых
+        сотрудников или None, если компании нет.
+        """
+        other = employees_companies.alias("other")
+        still_active = (
+            select(other.c.employee_id)
+            .join(CompanyModel, CompanyModel.id == other.c.company_id)
+            .where(
+                other.c.employee_id == EmployeeModel.id,
+                CompanyModel.is_active.is_(True),
+            )
+            .exists()
+        )
+        async with self.session.begin():
+            res = await self.session.execute(
+                update(CompanyModel)
+                .where(CompanyModel.id == company_id)
+                .values(is_active=False)
+                .returning(CompanyModel.id)
+            )
+            if res.scalar_one_or_none() is None:
+                return None
+            res = await self.session.execute(
+                update(EmployeeModel)
+                .where(
+                    employees_companies.c.company_id == company_id,
+                    EmployeeModel.id == employees_companies.c.employee_id,
+                    EmployeeModel.is_active.is_(True),
+                    ~still_active,
+                )
+                .values(token_generation=EmployeeModel.token_generation + 1)
+                .execution_options(synchronize_session=False)
+            )
+            return res.rowcount
+
+    # ---------- HELPERS ----------
+    async def employee_ids(self, company_id: int) -> List[int]:
+        """id сотрудников компании — без загрузки ORM-коллекции."""
+        async with self.session.begin():
+            res = await self.session.execute(
+                select(employees_companies.c.employee_id)
+                .where(employees_companies.c.company_id == company_id)
+            )
+            return list(res.scalars())
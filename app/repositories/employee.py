@@ -1,10 +1,23 @@
-from typing import Sequence, Iterable, Optional
+from datetime import datetime
+from typing import (
+    AsyncIterator, Dict, Iterator, List, Sequence, Iterable, Mapping,
+    Optional, Set,
+)
 
-from sqlalchemy import select, update, delete
+from sqlalchemy import (
+    DateTime, Integer, Row, Select, column, exists, func, literal, select,
+    update, delete, values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.orm import selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import EmployeeModel, CompanyModel
+from app.core.time_utils import utc_now
+from app.infrastructure.db.routing import replica_read
+from app.models import (
+    EmployeeModel, CompanyModel, RefreshTokenModel, employees_companies,
+)
+from .membership import MembershipRepository, active_company_ids
 
 
 class EmployeeRepository:
@@ -14,17 +27,58 @@ class EmployeeRepository:
         self.session = session
 
     # ---------- GET ----------
+    async def get_credentials(
+        self, username: str, with_company_ids: bool = False
+    ) -> Optional[Row]:
+        """
+        Лёгкая выборка для /login: только колонки, нужные для проверки
+        пароля и выпуска токенов, без ORM-объекта и связей. Активные
+        компании (для claims) — тем же запросом, подзапросом array_agg.
+        """
+        company_ids = (
+            active_company_ids(EmployeeModel.id) if with_company_ids
+            else literal(None, ARRAY(Integer))
+        )
+        res = await self.session.execute(
+            select(
+                EmployeeModel.id,
+                EmployeeModel.username,
+                EmployeeModel.password,
+                EmployeeModel.is_active,
+                EmployeeModel.token_generation,
+                EmployeeModel.status,
+                company_ids.label("company_ids"),
+            ).where(EmployeeModel.username == username)
+        )
+        return res.one_or_none()
+
+    async def token_generations(
+        self, usernames: Iterable[str]
+    ) -> Dict[str, int]:
+        """
+        username → token_generation (для проверки claim gen). Всегда с
+        primary: отставшая реплика оживила бы токены после «выхода везде».
+        """
+        res = await self.session.execute(
+            select(EmployeeModel.username, EmployeeModel.token_generation)
+            .where(EmployeeModel.username.in_(list(usernames)))
+        )
+        return dict(res.all())
+
+    @replica_read
     async def get_by_username(self, username: str) -> Optional[EmployeeModel]:
         stmt = select(EmployeeModel).where(EmployeeModel.username == username)
         res = await self.session.execute(stmt)
         return res.scalar_one_or_none()
 
+    @replica_read
     async def get_by_id(self, employee_id: int) -> Optional[EmployeeModel]:
         res = await self.session.execute(
             select(EmployeeModel).where(EmployeeModel.id == employee_id)
         )
         return res.scalar_one_or_none()
 
+    @replica_read
     async def get_by_id_with_companies(
         self,
         employee_id: int,
@@ -35,22 +89,71 @@ class EmployeeRepository:
         filter_active_companies=True  → в options накладываем
         CompanyModel.is_active == True
         """
-        opts = selectinload(EmployeeModel.companies)
+        rel = EmployeeModel.companies
         if filter_active_companies:
-            opts = opts.options(
-                selectinload(
-                    CompanyModel).where(
-                        CompanyModel.is_active.is_(True)
-                )
-            )
+            rel = rel.and_(CompanyModel.is_active.is_(True))
 
         res = await self.session.execute(
             select(EmployeeModel)
-            .options(opts)
+            .options(selectinload(rel))
             .where(EmployeeModel.id == employee_id)
         )
         return res.scalar_one_or_none()
 
+    # ---------- LIST ----------
+    @replica_read
+    async def list_page(
+        self,
+        *,
+        after_id: int = 0,
+        limit: int = 100,
+        is_active: bool | None = None,
+        company_id: int | None = None,
+        status: str | None = None,
+    ) -> Sequence[EmployeeModel]:
+        """Keyset-пагинация по id: WHERE id > :after ORDER BY id LIMIT n."""
+        res = await self.session.execute(
+            self._list_stmt(is_active, company_id, status)
+            .where(EmployeeModel.id > after_id)
+            .limit(limit)
+        )
+        return res.scalars().all()
+
+    @replica_read
+    async def stream_all(
+        self,
+        *,
+        is_active: bool | None = None,
+        company_id: int | None = None,
+        status: str | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[EmployeeModel]]:
+        """Весь список серверным курсором, пачками по batch_size."""
+        res = await self.session.stream_scalars(
+            self._list_stmt(is_active, company_id, status)
+            .execution_options(yield_per=batch_size)
+        )
+        async for part in res.partitions():
+            yield part
+
+    @staticmethod
+    def _list_stmt(
+        is_active: bool | None,
+        company_id: int | None,
+        status: str | None,
+    ) -> Select:
+        stmt = select(EmployeeModel).order_by(EmployeeModel.id)
+        if is_active is not None:
+            stmt = stmt.where(EmployeeModel.is_active.is_(is_active))
+        if status is not None:
+            stmt = stmt.where(EmployeeModel.status == status)
+        if company_id is not None:
+            stmt = stmt.where(exists().where(
+                employees_companies.c.employee_id == EmployeeModel.id,
+                employees_companies.c.company_id == company_id,
+            ))
+        return stmt
+
     # ---------- CREATE ----------
     async def create_employee(
         self,
@@ -60,12 +163,62 @@ class EmployeeRepository:
     ) -> EmployeeModel:
         """Создать сотрудника + связать с компаниями."""
         async with self.session.begin():
+            # связи — до add(): иначе autoflush сделает объект persistent,
+            # а ленивая загрузка коллекции запрещена (lazy="raise")
+            employee.companies = (
+                list(await self._get_companies(company_ids))
+                if company_ids else []
+            )
             self.session.add(employee)
-            if company_ids:
-                companies = await self._get_companies(company_ids)
-                employee.companies.extend(companies)
         return employee
 
+    async def bulk_create(
+        self,
+        rows: List[dict],
+        company_ids: Mapping[str, Iterable[int]],
+    ) -> Dict[str, int]:
+        """
+        Массовая вставка пачки (импорт): multi-row INSERT сотрудников
+        с ON CONFLICT (username) DO NOTHING и связей M-N, всё в одной
+        транзакции; большая пачка режется по лимиту параметров Postgres.
+        Вернуть {username: id} реально созданных; отсутствующие в ответе —
+        дубликаты.
+        """
+        if not rows:
+            return {}
+        now = utc_now()
+        prepared = [
+            {
+                "created_at": now, "updated_at": now,
+                "last_login": now, "is_active": True,
+                "token_generation": 0, **row,
+            }
+            for row in rows
+        ]
+        created: Dict[str, int] = {}
+        async with self.session.begin():
+            for batch in _bind_batches(prepared):
+                res = await self.session.execute(
+                    pg_insert(EmployeeModel)
+                    .values(batch)
+                    .on_conflict_do_nothing(index_elements=["username"])
+                    .returning(EmployeeModel.username, EmployeeModel.id)
+                )
+                created.update(res.all())
+
+            links = [
+                {"employee_id": emp_id, "company_id": comp_id}
+                for username, emp_id in created.items()
+                for comp_id in set(company_ids.get(username, ()))
+            ]
+            for batch in _bind_batches(links):
+                await self.session.execute(
+                    pg_insert(employees_companies)
+                    .values(batch)
+                    .on_conflict_do_nothing()
+                )
+        return created
+
     # ---------- UPDATE ----------
     async def update_employee(
         self,
@@ -74,8 +227,8 @@ class EmployeeRepository:
         company_ids: Iterable[int] | None = None,
     ) -> Optional[EmployeeModel]:
         """
-        Обновить поля и, если передан company_ids, пересоздать M-N связи:
-        старые удаляются, новые добавляются.
+        Обновить поля и, если передан company_ids, привести M-N связи
+        к этому набору (разница применяется в БД, коллекция не грузится).
         """
         async with self.session.begin():
             emp = await self.get_by_id(employee_id)
@@ -84,21 +237,31 @@ class EmployeeRepository:
 
             for key, value in data.items():
                 setattr(emp, key, value)
+            if "password" in data or data.get("is_active") is False:
+                # смена пароля / деактивация — все сессии недействительны
+                emp.token_generation = EmployeeModel.token_generation + 1
 
             if company_ids is not None:
-                emp.companies = await self._get_companies(company_ids)
+                await MembershipRepository(self.session).sync_companies(
+                    employee_id, company_ids)
         return emp
 
     # ---------- DELETE ----------
     async def delete_employee(self, employee_id: int) -> bool:
-        """Удалить сотрудника и порвать связи."""
+        """Удалить сотрудника и порвать связи — тремя DELETE, без загрузки."""
         async with self.session.begin():
-            emp = await self.get_by_id(employee_id)
-            if not emp:
-                return False
-            emp.companies.clear()        # разрыв M-N
-            await self.session.delete(emp)
-        return True
+            await MembershipRepository(self.session).unlink_employee(
+                employee_id)
+            await self.session.execute(
+                delete(RefreshTokenModel)
+                .where(RefreshTokenModel.employee_id == employee_id)
+            )
+            res = await self.session.execute(
+                delete(EmployeeModel)
+                .where(EmployeeModel.id == employee_id)
+                .returning(EmployeeModel.id)
+            )
+            return res.scalar_one_or_none() is not None
 
     # ---------- DEACTIVATE ----------
     async def disactivate_by_id(self, employee_id: int) -> bool:
@@ -106,14 +269,103 @@ class EmployeeRepository:
             res = await self.session.execute(
                 update(EmployeeModel)
                 .where(EmployeeModel.id == employee_id)
-                .values(is_active=False)
+                .values(
+                    is_active=False,
+                    token_generation=EmployeeModel.token_generation + 1,
+                )
                 .returning(EmployeeModel.id)
             )
             return res.scalar_one_or_none() is not None
 
+    # ---------- SESSIONS ----------
+    async def revoke_all_sessions(self, username: str) -> bool:
+        """
+        «Выйти везде»: сдвинуть эпоху сессий одной строкой.
+        Все ранее выпущенные refresh-токены перестают ротироваться.
+        """
+        async with self.session.begin():
+            res = await self.session.execute(
+                update(EmployeeModel)
+                .where(EmployeeModel.username == username)
+                .values(token_generation=EmployeeModel.token_generation + 1)
+                .returning(EmployeeModel.id)
+            )
+            return res.scalar_one_or_none() is not None
+
+    # ---------- LAST LOGIN ----------
+    async def bulk_set_last_login(
+        self, logins: Mapping[int, datetime]
+    ) -> int:
+        """
+        Один UPDATE ... FROM (VALUES ...) на все накопленные входы.
+        GREATEST — чтобы запоздалая пачка другого воркера не откатила время.
+        """
+        if not logins:
+            return 0
+        v = values(
+            column("id", Integer),
+            column("ts", DateTime(timezone=True)),
+            name="v",
+        ).data(list(logins.items()))
+        async with self.session.begin():
+            res = await self.session.execute(
+                update(EmployeeModel)
+                .where(EmployeeModel.id == v.c.id)
+                .values(
+                    last_login=func.greatest(EmployeeModel.last_login, v.c.ts),
+                    # вход — не изменение профиля: updated_at не трогаем
+                    updated_at=EmployeeModel.updated_at,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            return res.rowcount
+
+    # ---------- PASSWORD ----------
+    async def replace_password_hash(
+        self, employee_id: int, old_hash: str, new_hash: str
+    ) -> bool:
+        """
+        Заменить хеш тем же паролем, но по новой политике. Условие на
+        старый хеш: если пароль успели сменить, ничего не затираем.
+        Эпоху токенов не трогаем — пароль прежний.
+        """
+        async with self.session.begin():
+            res = await self.session.execute(
+                update(EmployeeModel)
+                .where(
+                    EmployeeModel.id == employee_id,
+                    EmployeeModel.password == old_hash,
+                )
+                .values(password=new_hash, updated_at=EmployeeModel.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            return res.rowcount > 0
+
     # ---------- HELPERS ----------
+    async def existing_company_ids(self, ids: Iterable[int]) -> Set[int]:
+        """Какие из переданных id компаний существуют (только id, без ORM)."""
+        async with self.session.begin():
+            res = await self.session.execute(
+                select(CompanyModel.id).where(CompanyModel.id.in_(list(ids)))
+            )
+            return set(res.scalars())
+
     async def _get_companies(self, ids: Iterable[int]) -> Sequence[CompanyModel]:
         res = await self.session.execute(
             select(CompanyModel).where(CompanyModel.id.in_(list(ids)))
         )
         return res.scalars().all()
+
+
+# ── multi-row INSERT ───────────────────────────────────────────
+# протокол Postgres: не больше 32767 параметров на выражение
+MAX_BIND_PARAMS = 32767
+
+
+def _bind_batches(rows: List[dict]) -> Iterator[List[dict]]:
+    """Нарезать строки так, чтобы VALUES пачки влезал в лимит параметров."""
+    if not rows:
+        return
+    size = max(1, MAX_BIND_PARAMS // len(rows[0]))
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
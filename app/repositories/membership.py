@@ -0,0 +1,97 @@
+from typing import Iterable
+
+from sqlalchemy import (
+    Integer, ScalarSelect, any_, delete, func, literal, select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import CompanyModel, EmployeeModel, employees_companies
+
+ec = employees_companies
+
+
+def _ids(ids: Iterable[int]):
+    # один параметр-массив вместо IN (:1, …, :n) — план не зависит от n
+    return any_(literal(sorted(set(ids)), ARRAY(Integer)))
+
+
+def active_company_ids(employee_id) -> ScalarSelect:
+    """Подзапрос: массив id активных компаний сотрудника (для claims)."""
+    return (
+        select(func.coalesce(
+            func.array_agg(ec.c.company_id), literal([], ARRAY(Integer))
+        ))
+        .join(CompanyModel, CompanyModel.id == ec.c.company_id)
+        .where(ec.c.employee_id == employee_id,
+               CompanyModel.is_active.is_(True))
+        .scalar_subquery()
+    )
+
+
+class MembershipRepository:
+    """
+    Связи сотрудник ↔ компания как множества строк employees_companies:
+    INSERT … ON CONFLICT DO NOTHING / DELETE … WHERE, без ORM-коллекций.
+    Транзакцией управляет вызывающий репозиторий.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    # ---------- EMPLOYEE SIDE ----------
+    async def sync_companies(
+        self, employee_id: int, company_ids: Iterable[int]
+    ) -> None:
+        """Привести связи сотрудника к company_ids (неизвестные id — мимо)."""
+        company_ids = list(company_ids)
+        await self.session.execute(
+            delete(ec).where(
+                ec.c.employee_id == employee_id,
+                ~(ec.c.company_id == _ids(company_ids)),
+            )
+        )
+        await self.session.execute(
+            pg_insert(ec)
+            .from_select(
+                ["employee_id", "company_id"],
+                select(literal(employee_id, Integer), CompanyModel.id)
+                .where(CompanyModel.id == _ids(company_ids)),
+            )
+            .on_conflict_do_nothing()
+        )
+
+    async def unlink_employee(self, employee_id: int) -> None:
+        await self.session.execute(
+            delete(ec).where(ec.c.employee_id == employee_id))
+
+    # ---------- COMPANY SIDE ----------
+    async def add_members(
+        self, company_id: int, employee_ids: Iterable[int]
+    ) -> int:
+        """Добавить существующих сотрудников; вернуть число новых связей."""
+        res = await self.session.execute(
+            pg_insert(ec)
+            .from_select(
+                ["employee_id", "company_id"],
+                select(EmployeeModel.id, literal(company_id, Integer))
+                .where(EmployeeModel.id == _ids(employee_ids)),
+            )
+            .on_conflict_do_nothing()
+        )
+        return res.rowcount
+
+    async def remove_members(
+        self, company_id: int, employee_ids: Iterable[int]
+    ) -> int:
+        res = await self.session.execute(
+            delete(ec).where(
+                ec.c.company_id == company_id,
+                ec.c.employee_id == _ids(employee_ids),
+            )
+        )
+        return res.rowcount
+
+    async def unlink_company(self, company_id: int) -> None:
+        await self.session.execute(
+            delete(ec).where(ec.c.company_id == company_id))
@@ -0,0 +1,261 @@
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import (
+    DateTime, Integer, Row, String, delete, false, func, insert, literal,
+    select, text, update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.time_utils import utc_now
+from app.models import EmployeeModel, RefreshTokenModel
+from .membership import active_company_ids
+
+
+class RefreshTokenRepository:
+    """Операции с refresh-токенами."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    # ---------- CREATE ----------
+    async def create(
+        self, *, jti: str, employee_id: int, expires_at: datetime
+    ) -> None:
+        await self.insert_many([
+            {"jti": jti, "employee_id": employee_id, "expires_at": expires_at}
+        ])
+
+    async def insert_many(self, rows: List[dict]) -> None:
+        """Один INSERT ... VALUES (...), (...) в одной транзакции."""
+        now = utc_now()
+        async with self.session.begin():
+            await self.session.execute(
+                insert(RefreshTokenModel).values(
+                    [{"revoked": False, "created_at": now, **r} for r in rows]
+                )
+            )
+
+    # ---------- READ ----------
+    async def active_jtis(self, jtis: Iterable[str]) -> Set[str]:
+        """Из переданных jti — те, что не отозваны и не истекли."""
+        res = await self.session.execute(
+            select(RefreshTokenModel.jti).where(
+                RefreshTokenModel.jti.in_(list(jtis)),
+                RefreshTokenModel.revoked.is_(False),
+                RefreshTokenModel.expires_at > func.now(),
+            )
+        )
+        return set(res.scalars())
+
+    # ---------- ROTATE ----------
+    async def rotate(
+        self,
+        *,
+        old_jti: str,
+        generation: int,
+        new_jti: str,
+        new_expires_at: datetime,
+        with_company_ids: bool = False,
+    ) -> Optional[Row]:
+        """
+        Атомарно отозвать старый токен и выпустить новый одним запросом:
+
+            WITH revoked AS (
+                UPDATE refresh_tokens SET revoked = true FROM employees
+                WHERE jti = :old AND NOT revoked AND expires_at > now()
+                  AND employees.id = employee_id
+                  AND employees.token_generation = :generation
+                RETURNING employee_id
+            )
+            , issued AS (
+                INSERT INTO refresh_tokens (...)
+                SELECT :new, employee_id, ... FROM revoked
+                RETURNING employee_id
+            )
+            SELECT e.id, e.status, [активные компании] FROM issued
+            JOIN employees e ON e.id = issued.employee_id
+
+        Вернуть строку (id, status, company_ids) владельца — данные для
+        claims нового access-токена — или None, если токен уже отозван,
+        истёк, не существует или выпущен до «выхода везде» (эпоха
+        сотрудника ушла вперёд). Параллельные ротации одного jti
+        сериализуются блокировкой строки — выигрывает ровно одна.
+        """
+        revoked = (
+            update(RefreshTokenModel)
+            .where(
+                RefreshTokenModel.jti == old_jti,
+                RefreshTokenModel.revoked.is_(False),
+                RefreshTokenModel.expires_at > func.now(),
+                EmployeeModel.id == RefreshTokenModel.employee_id,
+                EmployeeModel.token_generation == generation,
+            )
+            .values(revoked=True)
+            .returning(RefreshTokenModel.employee_id)
+            .cte("revoked")
+        )
+        issued = (
+            insert(RefreshTokenModel)
+            .from_select(
+                ["jti", "employee_id", "expires_at", "revoked", "created_at"],
+                select(
+                    literal(new_jti, String(36)),
+                    revoked.c.employee_id,
+                    literal(new_expires_at, DateTime(timezone=True)),
+                    false(),
+                    literal(utc_now(), DateTime(timezone=True)),
+                ),
+            )
+            .returning(RefreshTokenModel.employee_id)
+            .cte("issued")
+        )
+        company_ids = (
+            active_company_ids(EmployeeModel.id) if with_company_ids
+            else literal(None, ARRAY(Integer))
+        )
+        stmt = select(
+            EmployeeModel.id,
+            EmployeeModel.status,
+            company_ids.label("company_ids"),
+        ).join(issued, EmployeeModel.id == issued.c.employee_id)
+        async with self.session.begin():
+            res = await self.session.execute(stmt)
+            return res.one_or_none()
+
+    # ---------- REVOKE ----------
+    async def revoke(self, jti: str) -> bool:
+        async with self.session.begin():
+            res = await self.session.execute(
+                update(RefreshTokenModel)
+                .where(RefreshTokenModel.jti == jti)
+                .values(revoked=True)
+                .returning(RefreshTokenModel.id)
+            )
+            return res.scalar_one_or_none() is not None
+
+    # ---------- PURGE ----------
+    async def purge_batch(self, limit: int) -> int:
+        """
+        Удалить до `limit` истёкших или отозванных токенов; вернуть число
+        удалённых строк. Условия — отдельными DELETE: каждое идёт по своему
+        индексу (expires_at / частичный WHERE revoked), а OR между ними
+        свёлся бы к seq scan. SKIP LOCKED — параллельные чистильщики (по
+        одному на воркер) не ждут друг друга и строки, занятые ротацией.
+        """
+        deleted = 0
+        for condition in (
+            RefreshTokenModel.expires_at < func.now(),
+            RefreshTokenModel.revoked.is_(True),
+        ):
+            if deleted >= limit:
+                break
+            victims = (
+                select(RefreshTokenModel.id)
+                .where(condition)
+                .limit(limit - deleted)
+                .with_for_update(skip_locked=True)
+            )
+            async with self.session.begin():
+                res = await self.session.execute(
+                    delete(RefreshTokenModel)
+                    .where(RefreshTokenModel.id.in_(
+                        victims.scalar_subquery()))
+                )
+            deleted += res.rowcount
+        return deleted
+
+    async def table_stats(self) -> dict:
+        """Размер таблицы (со всеми секциями и индексами) и оценка строк."""
+        async with self.session.begin():
+            res = await self.session.execute(text(
+                "SELECT coalesce(sum(pg_total_relation_size(c.oid)), 0),"
+                "       coalesce(sum(greatest(c.reltuples, 0)), 0)::bigint,"
+                "       count(*) "
+                "FROM pg_class c "
+                "WHERE c.relkind = 'r' "
+                "  AND (c.oid = 'refresh_tokens'::regclass OR c.oid IN ("
+                "       SELECT relid FROM pg_partition_tree('refresh_tokens')))"
+            ))
+            size, rows, partitions = res.one()
+        return {
+            "total_bytes": int(size),
+            "estimated_rows": int(rows),
+            "partitions": int(partitions),
+        }
+
+    # ---------- PARTITIONS ----------
+    # DDL секций выполняют все воркеры: транзакционная advisory-блокировка
+    # сериализует их, иначе параллельные CREATE / DROP падают друг на друге
+    async def ensure_partitions(self, months: List[datetime]) -> None:
+        """Создать месячные секции (если их нет) для переданных месяцев."""
+        async with self.session.begin():
+            await self.session.execute(text(
+                "SELECT pg_advisory_xact_lock(hashtext(:key))"
+            ), {"key": PARTITION_LOCK_KEY})
+            for start in months:
+                end = _next_month(start)
+                await self.session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {_partition_name(start)} "
+                    f"PARTITION OF refresh_tokens FOR VALUES "
+                    f"FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+
+    async def drop_expired_partitions(self, now: datetime) -> List[str]:
+        """
+        Удалить секции, верхняя граница которых уже в прошлом: все токены
+        в них истекли, DROP мгновенен и не оставляет «дыр» в индексах.
+        Если секциями уже занят другой воркер — ничего не делать.
+        """
+        async with self.session.begin():
+            locked = await self.session.scalar(text(
+                "SELECT pg_try_advisory_xact_lock(hashtext(:key))"
+            ), {"key": PARTITION_LOCK_KEY})
+            if not locked:
+                return []
+            res = await self.session.execute(text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'refresh_tokens'::regclass"
+            ))
+            dropped = [
+                name for name in res.scalars()
+                if (_partition_end(name) or now) < now
+            ]
+            for name in dropped:
+                await self.session.execute(
+                    text(f"DROP TABLE IF EXISTS {name}"))
+        return dropped
+
+
+# ── секции: refresh_tokens_pYYYYMM ─────────────────────────────
+PARTITION_LOCK_KEY = "refresh_tokens:partitions"
+
+
+def _next_month(start: datetime) -> datetime:
+    if start.month == 12:
+        return start.replace(year=start.year + 1, month=1)
+    return start.replace(month=start.month + 1)
+
+
+def _partition_name(start: datetime) -> str:
+    return f"refresh_tokens_p{start:%Y%m}"
+
+
+def _partition_end(name: str) -> Optional[datetime]:
+    suffix = name.rsplit("_p", 1)[-1]
+    if len(suffix) != 6 or not suffix.isdigit():
+        return None
+    start = datetime(int(suffix[:4]), int(suffix[4:]), 1, tzinfo=timezone.utc)
+    return _next_month(start)
+
+
+def month_starts(first: datetime, last: datetime) -> List[datetime]:
+    """Начала месяцев (UTC), покрывающих интервал [first, last]."""
+    cur = datetime(first.year, first.month, 1, tzinfo=timezone.utc)
+    months = []
+    while cur <= last:
+        months.append(cur)
+        cur = _next_month(cur)
+    return months
@@ -1,15 +1,17 @@
 from .employee import (
-    EmployeeCreate, EmployeeOut, EmployeeOutWithCompanies, EmployeeUpdate)
+    EmployeeCreate, EmployeeOut, EmployeeOutWithCompanies, EmployeePage,
+    EmployeeUpdate)
 from .company import (
-    CompanyCreate, CompanyOut, CompanyUpdate
+    CompanyCreate, CompanyOut, CompanyPage, CompanyUpdate
 )
 from .auth import (
-    TokenPair
+    IntrospectIn, IntrospectOut, TokenIntrospection, TokenPair
 )
 
 
 __all__ = [
     "EmployeeCreate", "EmployeeOut", "EmployeeOutWithCompanies",
-    "EmployeeUpdate", "CompanyCreate", "CompanyOut", "CompanyUpdate",
-    "TokenPair"
+    "EmployeePage", "EmployeeUpdate", "CompanyCreate", "CompanyOut",
+    "CompanyPage", "CompanyUpdate", "IntrospectIn", "IntrospectOut",
+    "TokenIntrospection", "TokenPair"
 ]
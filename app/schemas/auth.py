@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel, ConfigDict, Field
 
 
@@ -7,3 +9,28 @@ class TokenPair(BaseModel):
     token_type: str = "bearer"
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class IntrospectIn(BaseModel):
+    """Пачка токенов на проверку (порядок ответа — тот же)."""
+    tokens: List[str] = Field(min_length=1)
+
+
+class TokenIntrospection(BaseModel):
+    """
+    Ответ в духе RFC 7662: для невалидного токена — только active=false.
+    uid / st / cid — доп. claims access-токена, если они в нём есть.
+    """
+    active: bool
+    sub: str | None = None
+    username: str | None = None
+    token_type: str | None = None
+    jti: str | None = None
+    exp: int | None = None
+    uid: int | None = None
+    st: str | None = None
+    cid: List[int] | None = None
+
+
+class IntrospectOut(BaseModel):
+    results: List[TokenIntrospection]
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import List
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -27,3 +28,9 @@ class CompanyOut(_CompanyBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CompanyPage(BaseModel):
+    """Страница keyset-пагинации: следующий запрос — ?after_id=next_after."""
+    items: List[CompanyOut]
+    next_after: int | None = None
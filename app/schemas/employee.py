@@ -47,3 +47,9 @@ class EmployeeOutWithCompanies(EmployeeOut):
     companies: List[CompanyOut]
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class EmployeePage(BaseModel):
+    """Страница keyset-пагинации: следующий запрос — ?after_id=next_after."""
+    items: List[EmployeeOut]
+    next_after: int | None = None
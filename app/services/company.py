@@ -1,10 +1,11 @@
-from typing import Optional
+from typing import AsyncIterator, Iterable, Optional, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infrastructure.cache import cache, company_key, employee_keys
 from app.models import CompanyModel
 from app.repositories import CompanyRepository
-from app.schemas import CompanyCreate, CompanyUpdate
+from app.schemas import CompanyCreate, CompanyOut, CompanyUpdate
 
 
 class CompanyService:
@@ -14,8 +15,24 @@ class CompanyService:
         self._repo = CompanyRepository(db)
 
     # ---------- READ ----------
-    async def get_by_id(self, company_id: int) -> Optional[CompanyModel]:
-        return await self._repo.get_by_id(company_id)
+    async def get_by_id(self, company_id: int) -> Optional[CompanyOut]:
+        """Read-through: кеш → БД; отсутствующие компании не кешируются."""
+        key = company_key(company_id)
+        cached = await cache.get(key, CompanyOut)
+        if cached is not None:
+            return cached
+        comp = await self._repo.get_by_id(company_id)
+        if comp is None:
+            return None
+        out = CompanyOut.model_validate(comp)
+        await cache.set(key, out)
+        return out
+
+    async def list_page(self, **filters) -> Sequence[CompanyModel]:
+        return await self._repo.list_page(**filters)
+
+    def stream_all(self, **filters) -> AsyncIterator[Sequence[CompanyModel]]:
+        return self._repo.stream_all(**filters)
 
     # ---------- CREATE ----------
     async def create_company(self, data: CompanyCreate) -> CompanyModel:
@@ -32,11 +49,71 @@ class CompanyService:
         data: CompanyUpdate,
     ) -> Optional[CompanyModel]:
         payload = data.model_dump(exclude_unset=True, exclude_none=True)
-        return await self._repo.update(company_id, payload)
+        comp = await self._repo.update(company_id, payload)
+        if comp is not None:
+            await self._invalidate(company_id)
+        return comp
+
+    # ---------- MEMBERS ----------
+    async def add_members(
+        self, company_id: int, employee_ids: Iterable[int]
+    ) -> int:
+        employee_ids = list(employee_ids)
+        added = await self._repo.add_members(company_id, employee_ids)
+        if added:
+            await self._invalidate_employees(employee_ids)
+        return added
+
+    async def remove_members(
+        self, company_id: int, employee_ids: Iterable[int]
+    ) -> int:
+        employee_ids = list(employee_ids)
+        removed = await self._repo.remove_members(company_id, employee_ids)
+        if removed:
+            await self._invalidate_employees(employee_ids)
+        return removed
 
     # ---------- DELETE / DEACTIVATE ----------
     async def delete_company(self, company_id: int) -> bool:
-        return await self._repo.delete(company_id)
+        # связи исчезнут вместе с компанией — список сотрудников берём до
+        employee_ids = await self._repo.employee_ids(company_id)
+        deleted = await self._repo.delete(company_id)
+        if deleted:
+            await self._invalidate(company_id, employee_ids)
+        return deleted
 
     async def disactivate_company(self, company_id: int) -> bool:
-        return await self._repo.disactivate_by_id(company_id)
+        done = await self._repo.disactivate_by_id(company_id)
+        if done:
+            await self._invalidate(company_id)
+        return done
+
+    async def disactivate_company_and_revoke_sessions(
+        self, company_id: int
+    ) -> Optional[int]:
+        """
+        Деактивация + отзыв сессий сотрудников без других активных компаний.
+        Вернуть число сотрудников, чьи сессии отозваны; None — нет компании.
+        """
+        revoked = await self._repo.disactivate_and_revoke_sessions(company_id)
+        if revoked is not None:
+            await self._invalidate(company_id)
+        return revoked
+
+    # ---------- HELPERS ----------
+    async def _invalidate(
+        self,
+        company_id: int,
+        employee_ids: Sequence[int] | None = None,
+    ) -> None:
+        """Компания + сотрудники, в чьих ответах она вложена."""
+        if employee_ids is None:
+            employee_ids = await self._repo.employee_ids(company_id)
+        await cache.delete(company_key(company_id))
+        await self._invalidate_employees(employee_ids)
+
+    @staticmethod
+    async def _invalidate_employees(employee_ids: Iterable[int]) -> None:
+        await cache.delete(
+            *(key for emp_id in employee_ids for key in employee_keys(emp_id))
+        )
@@ -1,11 +1,31 @@
-from typing import Iterable, Optional
+from dataclasses import dataclass
+from typing import (
+    AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Set,
+    Tuple,
+)
 
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import get_password_hash
+from app.core.hashing import PasswordHasherPool, password_hasher
+from app.infrastructure.cache import cache, employee_key, employee_keys
 from app.models import EmployeeModel
 from app.repositories import EmployeeRepository
-from app.schemas import EmployeeCreate, EmployeeUpdate
+from app.schemas import (
+    EmployeeCreate, EmployeeOutWithCompanies, EmployeeUpdate,
+)
+
+
+@dataclass
+class ImportReport:
+    """Счётчики массового импорта (ошибки по строкам — через on_error)."""
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+
+
+class InvalidRecord(ValueError):
+    """Строку источника не удалось разобрать — считается ошибкой строки."""
 
 
 class EmployeeService:
@@ -25,15 +45,31 @@ class EmployeeService:
         self,
         employee_id: int,
         only_active_companies: bool = False,
-    ) -> Optional[EmployeeModel]:
-        return await self._repo.get_by_id_with_companies(
+    ) -> Optional[EmployeeOutWithCompanies]:
+        """Read-through: кеш → БД; отсутствующие не кешируются."""
+        key = employee_key(employee_id, only_active_companies)
+        cached = await cache.get(key, EmployeeOutWithCompanies)
+        if cached is not None:
+            return cached
+        emp = await self._repo.get_by_id_with_companies(
             employee_id,
             filter_active_companies=only_active_companies,
         )
+        if emp is None:
+            return None
+        out = EmployeeOutWithCompanies.model_validate(emp)
+        await cache.set(key, out)
+        return out
+
+    async def list_page(self, **filters) -> Sequence[EmployeeModel]:
+        return await self._repo.list_page(**filters)
+
+    def stream_all(self, **filters) -> AsyncIterator[Sequence[EmployeeModel]]:
+        return self._repo.stream_all(**filters)
 
     # ---------- CREATE ----------
     async def create_employee(self, data: EmployeeCreate) -> EmployeeModel:
-        hashed_pwd = get_password_hash(data.password)
+        hashed_pwd = await password_hasher.hash(data.password)
         employee = EmployeeModel(
             username=data.username,
             password=hashed_pwd,
@@ -42,11 +78,108 @@ class EmployeeService:
             patronymic=data.patronymic,
             status=data.status,
         )
-        return await self._repo.create(
+        return await self._repo.create_employee(
             employee=employee,
             company_ids=data.company_ids,
         )
 
+    # ---------- BULK IMPORT ----------
+    async def import_employees(
+        self,
+        records: Iterable[Tuple[int, dict]],
+        *,
+        chunk_size: int = 1000,
+        hasher: PasswordHasherPool = password_hasher,
+        on_progress: Callable[[ImportReport], None] | None = None,
+        on_error: Callable[[int, str], None] | None = None,
+    ) -> ImportReport:
+        """
+        Потоковый импорт сотрудников из (номер_строки, dict). Вместо dict
+        читатель может отдать InvalidRecord — строка уходит в on_error,
+        импорт продолжается.
+
+        В памяти держится только текущая пачка: валидация → параллельное
+        хеширование паролей → проверка компаний (известные id кешируются
+        на весь импорт) → multi-row INSERT сотрудников и связей M-N.
+        """
+        report = ImportReport()
+        known_companies: Set[int] = set()
+        chunk: List[Tuple[int, EmployeeCreate]] = []
+
+        def fail(line_no: int, message: str) -> None:
+            report.failed += 1
+            if on_error:
+                on_error(line_no, message)
+
+        async def flush() -> None:
+            await self._import_chunk(
+                chunk, hasher, known_companies, report, fail)
+            chunk.clear()
+            if on_progress:
+                on_progress(report)
+
+        for line_no, raw in records:
+            report.processed += 1
+            if isinstance(raw, InvalidRecord):
+                fail(line_no, str(raw))
+                continue
+            try:
+                chunk.append((line_no, EmployeeCreate.model_validate(raw)))
+            except ValidationError as exc:
+                fail(line_no, exc.errors()[0]["msg"])
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+        return report
+
+    async def _import_chunk(
+        self,
+        chunk: List[Tuple[int, EmployeeCreate]],
+        hasher: PasswordHasherPool,
+        known_companies: Set[int],
+        report: ImportReport,
+        fail: Callable[[int, str], None],
+    ) -> None:
+        wanted = {cid for _, e in chunk for cid in e.company_ids or ()}
+        unknown = wanted - known_companies
+        if unknown:
+            known_companies |= await self._repo.existing_company_ids(unknown)
+
+        accepted: Dict[str, Tuple[int, EmployeeCreate]] = {}
+        for line_no, emp in chunk:
+            missing = set(emp.company_ids or ()) - known_companies
+            if missing:
+                fail(line_no, f"Компании не найдены: {sorted(missing)}")
+            elif emp.username in accepted:
+                fail(line_no, "Дубликат username в файле")
+            else:
+                accepted[emp.username] = (line_no, emp)
+        if not accepted:
+            return
+
+        hashes = await hasher.hash_many(
+            [emp.password for _, emp in accepted.values()])
+        rows = [
+            {
+                "username": emp.username,
+                "password": hashed,
+                "last_name": emp.last_name,
+                "name": emp.name,
+                "patronymic": emp.patronymic,
+                "status": emp.status,
+            }
+            for (_, emp), hashed in zip(accepted.values(), hashes)
+        ]
+        created = await self._repo.bulk_create(
+            rows,
+            {u: emp.company_ids or () for u, (_, emp) in accepted.items()},
+        )
+        report.created += len(created)
+        for username, (line_no, _) in accepted.items():
+            if username not in created:
+                fail(line_no, "Пользователь уже существует")
+
     # ---------- UPDATE ----------
     async def update_employee(
         self,
@@ -58,17 +191,28 @@ class EmployeeService:
 
         # если передали новый пароль ― хешируем
         if "password" in payload:
-            payload["password"] = get_password_hash(payload["password"])
+            payload["password"] = await password_hasher.hash(
+                payload["password"]
+            )
 
-        return await self._repo.update(
+        emp = await self._repo.update_employee(
             employee_id=employee_id,
             data=payload,
             company_ids=company_ids,
         )
+        if emp is not None:
+            await cache.delete(*employee_keys(employee_id))
+        return emp
 
     # ---------- DELETE / DEACTIVATE ----------
     async def delete_employee(self, employee_id: int) -> bool:
-        return await self._repo.delete(employee_id)
+        deleted = await self._repo.delete_employee(employee_id)
+        if deleted:
+            await cache.delete(*employee_keys(employee_id))
+        return deleted
 
     async def disactivate_employee(self, employee_id: int) -> bool:
-        return await self._repo.disactivate_by_id(employee_id)
+        done = await self._repo.disactivate_by_id(employee_id)
+        if done:
+            await cache.delete(*employee_keys(employee_id))
+        return done
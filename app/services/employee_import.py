@@ -0,0 +1,85 @@
+"""
+Массовый импорт сотрудников из CSV или JSONL (потоково).
+
+    python -m app.services.employee_import employees.csv
+    python -m app.services.employee_import employees.jsonl --chunk 2000
+
+CSV: заголовок username,password,last_name,name,patronymic,status,
+company_ids (id через «;»). JSONL: объект EmployeeCreate на строку.
+Ошибки строк печатаются в stdout как JSONL, прогресс — в stderr.
+"""
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from typing import IO, Iterator, Tuple
+
+from app.core.hashing import PasswordHasherPool
+from app.infrastructure.db.session import async_session_maker
+from app.services.employee import (
+    EmployeeService, ImportReport, InvalidRecord,
+)
+
+
+def read_csv(fh: IO[str]) -> Iterator[Tuple[int, dict]]:
+    reader = csv.DictReader(fh)
+    for row in reader:
+        ids = (row.get("company_ids") or "").strip()
+        # приведение к int и ошибки формата — на стороне EmployeeCreate
+        row["company_ids"] = [i for i in ids.split(";") if i] or None
+        yield reader.line_num, row
+
+
+def read_jsonl(fh: IO[str]) -> Iterator[Tuple[int, dict | InvalidRecord]]:
+    for line_no, line in enumerate(fh, start=1):
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, InvalidRecord(f"Некорректный JSON: {exc.msg}")
+            continue
+        if not isinstance(value, dict):
+            yield line_no, InvalidRecord("Ожидался JSON-объект")
+            continue
+        yield line_no, value
+
+
+async def run(path: str, fmt: str, chunk_size: int, workers: int | None,
+              ) -> ImportReport:
+    hasher = PasswordHasherPool(
+        executor="process", workers=workers, queue_size=0)
+    reader = read_jsonl if fmt == "jsonl" else read_csv
+
+    def progress(r: ImportReport) -> None:
+        print(f"обработано {r.processed}, создано {r.created}, "
+              f"ошибок {r.failed}", file=sys.stderr)
+
+    def error(line_no: int, message: str) -> None:
+        print(json.dumps({"line": line_no, "error": message},
+                         ensure_ascii=False))
+
+    try:
+        with open(path, encoding="utf-8", newline="") as fh:
+            async with async_session_maker() as session:
+                return await EmployeeService(session).import_employees(
+                    reader(fh),
+                    chunk_size=chunk_size,
+                    hasher=hasher,
+                    on_progress=progress,
+                    on_error=error,
+                )
+    finally:
+        hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--chunk", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    fmt = args.format or ("jsonl" if args.path.endswith(".jsonl") else "csv")
+    asyncio.run(run(args.path, fmt, args.chunk, args.workers))
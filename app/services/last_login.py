@@ -0,0 +1,89 @@
+"""
+Учёт последнего входа без записи в БД на каждый /login.
+
+Время входа кладётся в словарь employee_id → ts (остаётся только
+последнее значение); периодически и на shutdown словарь уходит одним
+UPDATE ... FROM (VALUES ...).
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict
+
+from app.config.settings import settings
+from app.core.time_utils import utc_now
+from app.infrastructure.db.session import async_session_maker
+from app.repositories.employee import EmployeeRepository
+
+log = logging.getLogger(__name__)
+
+
+class LastLoginRecorder:
+    """Буфер last_login с периодическим сбросом."""
+
+    def __init__(self, *, interval: float) -> None:
+        self._interval = interval
+        self._pending: Dict[int, datetime] = {}
+        self._task: asyncio.Task | None = None
+
+        self.flushes = 0
+        self.rows = 0
+
+    # ---------- API ----------
+    def record(self, employee_id: int) -> None:
+        """O(1), без I/O: повторные входы перезаписывают значение."""
+        self._pending[employee_id] = utc_now()
+
+    async def flush(self) -> int:
+        if not self._pending:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with async_session_maker() as session:
+                n = await EmployeeRepository(session).bulk_set_last_login(
+                    batch)
+        except Exception:
+            # вернуть несохранённое, не затирая более свежие входы
+            for emp_id, ts in batch.items():
+                self._pending.setdefault(emp_id, ts)
+            raise
+        self.flushes += 1
+        self.rows += n
+        return n
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """
+        Остановить цикл и сбросить остаток (shutdown). Ошибка сброса
+        только логируется: остальной shutdown должен пройти.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            log.exception("last_login не записан при остановке: %d строк",
+                          len(self._pending))
+
+    # ---------- HELPERS ----------
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+            except Exception:
+                log.exception("Не удалось записать last_login")
+
+
+last_login_recorder = LastLoginRecorder(
+    interval=settings.LAST_LOGIN_FLUSH_INTERVAL,
+)
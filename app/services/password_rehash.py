@@ -0,0 +1,69 @@
+"""
+Перехеширование устаревших хешей паролей после успешного входа.
+
+/login только ставит задачу (O(1), без I/O) — хеш по новой политике
+считается в пуле хеширования и пишется условным UPDATE уже после
+ответа клиенту. Под нагрузкой (пул переполнен) задача просто
+пропускается: пароль перехешируется при одном из следующих входов.
+"""
+import asyncio
+import logging
+from typing import Set
+
+from app.core.hashing import HashingOverloaded, password_hasher
+from app.infrastructure.db.session import async_session_maker
+from app.repositories.employee import EmployeeRepository
+
+log = logging.getLogger(__name__)
+
+
+class PasswordRehasher:
+    """Фоновые задачи перехеширования, не больше одной на сотрудника."""
+
+    def __init__(self) -> None:
+        self._in_flight: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.upgraded = 0
+        self.skipped = 0
+
+    # ---------- API ----------
+    def schedule(self, employee_id: int, password: str,
+                 old_hash: str) -> None:
+        if employee_id in self._in_flight:
+            return
+        self._in_flight.add(employee_id)
+        task = asyncio.create_task(
+            self._rehash(employee_id, password, old_hash))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ---------- LIFECYCLE ----------
+    async def stop(self) -> None:
+        """Дождаться начатых перехеширований (shutdown)."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    # ---------- HELPERS ----------
+    async def _rehash(self, employee_id: int, password: str,
+                      old_hash: str) -> None:
+        try:
+            new_hash = await password_hasher.hash(password)
+            async with async_session_maker() as session:
+                done = await EmployeeRepository(
+                    session).replace_password_hash(
+                        employee_id, old_hash, new_hash)
+            if done:
+                self.upgraded += 1
+            else:
+                self.skipped += 1
+        except HashingOverloaded:
+            self.skipped += 1
+        except Exception:
+            log.exception("Не удалось перехешировать пароль #%d",
+                          employee_id)
+        finally:
+            self._in_flight.discard(employee_id)
+
+
+password_rehasher = PasswordRehasher()
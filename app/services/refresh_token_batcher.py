@@ -0,0 +1,113 @@
+"""
+Group commit для вставок refresh-токенов.
+
+Конкурентные /login кладут строки в общий буфер; раз в несколько
+миллисекунд (или при заполнении) буфер уходит одним multi-row INSERT
+в одной транзакции. Каждый запрос ждёт коммита своей пачки — ответ
+никогда не отдаётся по незаписанному буферу.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy.exc import IntegrityError
+
+from app.config.settings import settings
+from app.infrastructure.db.session import async_session_maker
+from app.repositories.refresh_token import RefreshTokenRepository
+
+log = logging.getLogger(__name__)
+
+_Pending = Tuple[dict, asyncio.Future]
+
+
+class RefreshTokenBatcher:
+    """Копит строки refresh_tokens и сбрасывает их пачками."""
+
+    def __init__(self, *, max_batch: int, max_delay_ms: float) -> None:
+        self._max_batch = max_batch
+        self._max_delay = max_delay_ms / 1000
+        self._buffer: List[_Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.rows = 0
+
+    # ---------- API ----------
+    async def insert(
+        self, *, jti: str, employee_id: int, expires_at: datetime
+    ) -> None:
+        """Поставить строку в пачку и дождаться её коммита."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._buffer.append((
+            {"jti": jti, "employee_id": employee_id, "expires_at": expires_at},
+            fut,
+        ))
+        if len(self._buffer) >= self._max_batch:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._max_delay, self._schedule_flush)
+        await fut
+
+    async def close(self) -> None:
+        """Сбросить остаток и дождаться всех начатых пачек (shutdown)."""
+        self._schedule_flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    # ---------- HELPERS ----------
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        task = asyncio.create_task(self._flush(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        try:
+            await self._write([row for row, _ in batch])
+        except IntegrityError:
+            # одна плохая строка (напр. сотрудника удалили) не должна
+            # ронять всю пачку — дописываем по одной
+            await self._flush_one_by_one(batch)
+            return
+        except Exception as exc:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        self.batches += 1
+        self.rows += len(batch)
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_result(None)
+
+    async def _flush_one_by_one(self, batch: List[_Pending]) -> None:
+        for row, fut in batch:
+            try:
+                await self._write([row])
+            except Exception as exc:
+                if not fut.done():
+                    fut.set_exception(exc)
+            else:
+                self.rows += 1
+                if not fut.done():
+                    fut.set_result(None)
+
+    @staticmethod
+    async def _write(rows: List[dict]) -> None:
+        async with async_session_maker() as session:
+            await RefreshTokenRepository(session).insert_many(rows)
+
+
+refresh_token_batcher = RefreshTokenBatcher(
+    max_batch=settings.REFRESH_INSERT_BATCH_MAX,
+    max_delay_ms=settings.REFRESH_INSERT_BATCH_DELAY_MS,
+)
@@ -0,0 +1,156 @@
+"""
+Фоновая очистка refresh_tokens от истёкших и отозванных строк.
+
+Запускается циклом на старте приложения или разово из CLI:
+    python -m app.services.token_reaper
+"""
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from app.config.settings import settings
+from app.core.time_utils import utc_now
+from app.infrastructure.db.session import async_session_maker
+from app.repositories.refresh_token import (
+    RefreshTokenRepository,
+    month_starts,
+)
+
+log = logging.getLogger(__name__)
+
+
+class TokenReaper:
+    """
+    Удаление пачками + обслуживание секций; копит счётчики для /health.
+    С purge=False цикл только досоздаёт секции (если таблица секционирована).
+    """
+
+    def __init__(
+        self,
+        *,
+        batch_size: int,
+        interval: float,
+        partitioned: bool,
+        purge: bool = True,
+    ) -> None:
+        self._batch_size = batch_size
+        self._interval = interval
+        self._partitioned = partitioned
+        self._purge = purge
+        self._task: asyncio.Task | None = None
+
+        self.runs = 0
+        self.deleted_total = 0
+        self.partitions_dropped_total = 0
+        self.last_run_at: float | None = None
+        self.last_deleted = 0
+        self.last_duration = 0.0
+
+    # ---------- LIFECYCLE ----------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ---------- API ----------
+    async def ensure_partitions(self) -> None:
+        """Секции от текущего месяца до самого позднего возможного expires_at."""
+        if not self._partitioned:
+            return
+        now = utc_now()
+        horizon = now + timedelta(days=settings.REFRESH_EXPIRE_DAYS + 31)
+        async with async_session_maker() as session:
+            await RefreshTokenRepository(session).ensure_partitions(
+                month_starts(now, horizon)
+            )
+
+    async def run_once(self) -> int:
+        """Один полный проход; вернуть число удалённых строк."""
+        started = time.perf_counter()
+        deleted = 0
+
+        if self._partitioned:  # сбой DDL не должен отменять чистку строк
+            try:
+                await self.ensure_partitions()
+                async with async_session_maker() as session:
+                    dropped = await RefreshTokenRepository(
+                        session).drop_expired_partitions(utc_now())
+                self.partitions_dropped_total += len(dropped)
+            except Exception:
+                log.exception("Обслуживание секций refresh_tokens не удалось")
+
+        while True:  # короткие транзакции, чтобы не держать блокировки
+            async with async_session_maker() as session:
+                n = await RefreshTokenRepository(session).purge_batch(
+                    self._batch_size)
+            deleted += n
+            if n < self._batch_size:
+                break
+            await asyncio.sleep(0)  # уступаем event loop между пачками
+
+        self.runs += 1
+        self.deleted_total += deleted
+        self.last_deleted = deleted
+        self.last_duration = time.perf_counter() - started
+        self.last_run_at = time.time()
+        return deleted
+
+    async def stats(self) -> dict:
+        async with async_session_maker() as session:
+            table = await RefreshTokenRepository(session).table_stats()
+        return {
+            "table": table,
+            "purge": {
+                "runs": self.runs,
+                "deleted_total": self.deleted_total,
+                "partitions_dropped_total": self.partitions_dropped_total,
+                "last_run_at": self.last_run_at,
+                "last_deleted": self.last_deleted,
+                "last_duration_sec": round(self.last_duration, 3),
+                "last_rows_per_sec": (
+                    round(self.last_deleted / self.last_duration, 1)
+                    if self.last_duration else 0.0
+                ),
+            },
+        }
+
+    # ---------- HELPERS ----------
+    async def _loop(self) -> None:
+        while True:
+            try:
+                if self._purge:
+                    deleted = await self.run_once()
+                    log.info("refresh_tokens: удалено %s строк за %.2f c",
+                             deleted, self.last_duration)
+                else:  # чистка выключена, но будущие секции нужны всегда
+                    await self.ensure_partitions()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("Очистка refresh_tokens не удалась")
+            await asyncio.sleep(self._interval)
+
+
+token_reaper = TokenReaper(
+    batch_size=settings.REFRESH_PURGE_BATCH,
+    interval=settings.REFRESH_PURGE_INTERVAL,
+    partitioned=settings.REFRESH_TOKENS_PARTITIONED,
+    purge=settings.REFRESH_PURGE_ENABLED,
+)
+
+
+if __name__ == "__main__":
+    async def _main() -> None:
+        deleted = await token_reaper.run_once()
+        print(f"Удалено {deleted} строк за {token_reaper.last_duration:.2f} c")
+
+    asyncio.run(_main())